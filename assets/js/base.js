@@ -0,0 +1,146 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Mobile menu functionality
+    const mobileMenuToggle = document.getElementById('mobileMenuToggle');
+    const mobileMenuDropdown = document.getElementById('mobileMenuDropdown');
+
+    if (mobileMenuToggle && mobileMenuDropdown) {
+        mobileMenuToggle.addEventListener('click', function(e) {
+            e.stopPropagation();
+            mobileMenuDropdown.classList.toggle('active');
+
+            // Close user dropdown if open
+            userDropdownMenu.classList.remove('active');
+        });
+
+        // Close mobile menu when clicking outside
+        document.addEventListener('click', function(e) {
+            if (!mobileMenuToggle.contains(e.target) && !mobileMenuDropdown.contains(e.target)) {
+                mobileMenuDropdown.classList.remove('active');
+            }
+        });
+    }
+
+    // User dropdown functionality
+    const userDropdownToggle = document.getElementById('userDropdownToggle');
+    const userDropdownMenu = document.getElementById('userDropdownMenu');
+
+    if (userDropdownToggle && userDropdownMenu) {
+        userDropdownToggle.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+            userDropdownMenu.classList.toggle('active');
+
+            // Close mobile menu if open
+            mobileMenuDropdown.classList.remove('active');
+        });
+
+        // Close user dropdown when clicking outside
+        document.addEventListener('click', function(e) {
+            if (!userDropdownToggle.contains(e.target) && !userDropdownMenu.contains(e.target)) {
+                userDropdownMenu.classList.remove('active');
+            }
+        });
+    }
+
+    // Mobile search functionality
+    const mobileSearchToggle = document.getElementById('mobileSearchToggle');
+    const searchOverlay = document.getElementById('searchOverlay');
+    const closeSearch = document.getElementById('closeSearch');
+
+    function openSearchOverlay() {
+        if (searchOverlay) {
+            searchOverlay.classList.add('active');
+            document.body.style.overflow = 'hidden';
+
+            // Focus on search input
+            const searchInput = document.querySelector('.search-input-large');
+            if (searchInput) {
+                setTimeout(() => {
+                    searchInput.focus();
+                }, 300);
+            }
+
+            // Close any open dropdowns
+            mobileMenuDropdown.classList.remove('active');
+            userDropdownMenu.classList.remove('active');
+        }
+    }
+
+    function closeSearchOverlay() {
+        if (searchOverlay) {
+            searchOverlay.classList.remove('active');
+            document.body.style.overflow = 'auto';
+        }
+    }
+
+    if (mobileSearchToggle) {
+        mobileSearchToggle.addEventListener('click', openSearchOverlay);
+    }
+
+    if (closeSearch) {
+        closeSearch.addEventListener('click', closeSearchOverlay);
+    }
+
+    if (searchOverlay) {
+        searchOverlay.addEventListener('click', function(e) {
+            if (e.target === searchOverlay) {
+                closeSearchOverlay();
+            }
+        });
+    }
+
+    // Navbar scroll effect
+    window.addEventListener('scroll', function() {
+        const navbar = document.querySelector('.navbar-clean');
+        if (navbar) {
+            if (window.scrollY > 30) {
+                navbar.style.padding = '0.5rem 0';
+                navbar.style.boxShadow = '0 4px 15px rgba(0, 0, 0, 0.1)';
+            } else {
+                navbar.style.padding = '0.8rem 0';
+                navbar.style.boxShadow = '0 2px 10px rgba(0, 0, 0, 0.05)';
+            }
+        }
+    });
+
+    // Search functionality for desktop search box
+    const searchInput = document.querySelector('.search-input');
+    if (searchInput) {
+        searchInput.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter') {
+                const query = this.value.trim();
+                if (query) {
+                    // In a real app, you would submit the search here
+                    console.log(`Searching for: ${query}`);
+                    // Example: window.location.href = `/search?q=${encodeURIComponent(query)}`;
+                }
+            }
+        });
+    }
+
+    // Notification bell functionality
+    const notificationBell = document.getElementById('notificationBell');
+    const mobileNotificationBell = document.getElementById('mobileNotificationBell');
+
+    function toggleNotifications() {
+        // In a real app, this would open a notifications panel
+        alert('Notifications panel would open here');
+    }
+
+    if (notificationBell) {
+        notificationBell.addEventListener('click', toggleNotifications);
+    }
+
+    if (mobileNotificationBell) {
+        mobileNotificationBell.addEventListener('click', toggleNotifications);
+    }
+
+    // Close dropdowns when pressing Escape key
+    document.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            mobileMenuDropdown.classList.remove('active');
+            userDropdownMenu.classList.remove('active');
+            closeSearchOverlay();
+        }
+    });
+});
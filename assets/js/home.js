@@ -0,0 +1,324 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Scroll-based navbar behavior - Fixed version
+    let lastScrollTop = 0;
+    const navbar = document.querySelector('.top-navbar');
+    const contentTabs = document.querySelector('.content-tabs');
+    const isMobile = window.innerWidth <= 1024;
+
+    if (!isMobile) {
+        window.addEventListener('scroll', function() {
+            const scrollTop = window.pageYOffset || document.documentElement.scrollTop;
+
+            // Simplified scroll logic - only handle sticky tabs
+            if (scrollTop > 120) {
+                contentTabs.classList.add('sticky');
+                navbar.classList.add('hidden');
+            } else {
+                contentTabs.classList.remove('sticky');
+                navbar.classList.remove('hidden');
+            }
+
+            lastScrollTop = scrollTop;
+        });
+    }
+
+    // Consolidated click event delegation
+    document.addEventListener('click', function(e) {
+        // Like functionality
+        if (e.target.closest('.like-btn')) {
+            const btn = e.target.closest('.like-btn');
+            const icon = btn.querySelector('i');
+            const count = btn.querySelector('span');
+            let currentCount = parseInt(count.textContent.replace(/,/g, '')) || 0;
+
+            if (icon.classList.contains('far')) {
+                icon.classList.replace('far', 'fas');
+                count.textContent = currentCount + 1;
+                btn.classList.add('active');
+            } else {
+                icon.classList.replace('fas', 'far');
+                count.textContent = currentCount - 1;
+                btn.classList.remove('active');
+            }
+        }
+
+        // Bookmark functionality
+        else if (e.target.closest('.bookmark-btn')) {
+            const btn = e.target.closest('.bookmark-btn');
+            const icon = btn.querySelector('i');
+
+            if (icon.classList.contains('far')) {
+                icon.classList.replace('far', 'fas');
+                btn.classList.add('active');
+            } else {
+                icon.classList.replace('fas', 'far');
+                btn.classList.remove('active');
+            }
+        }
+
+        // Options menu functionality
+        else if (e.target.closest('.more-options-btn')) {
+            const moreOptionsBtn = e.target.closest('.more-options-btn');
+            const menu = moreOptionsBtn.nextElementSibling;
+
+            // Close all other menus
+            document.querySelectorAll('.options-menu').forEach(otherMenu => {
+                if (otherMenu !== menu) {
+                    otherMenu.classList.remove('active');
+                }
+            });
+
+            // Toggle current menu
+            if (menu && menu.classList.contains('options-menu')) {
+                menu.classList.toggle('active');
+                e.stopPropagation();
+            }
+        }
+
+        // Menu item clicks - stop propagation to prevent immediate close
+        else if (e.target.closest('.menu-item')) {
+            const menuItem = e.target.closest('.menu-item');
+            e.stopPropagation(); // Prevent menu from closing immediately
+
+            // Handle menu item action here
+            const menu = menuItem.closest('.options-menu');
+            if (menu) {
+                // Close menu after click
+                setTimeout(() => {
+                    menu.classList.remove('active');
+                }, 300);
+            }
+        }
+
+        // Comment functionality
+        else if (e.target.closest('.comment-btn')) {
+            const commentBtn = e.target.closest('.comment-btn');
+            const blogId = commentBtn.getAttribute('data-blog-id');
+            openCommentsModal(blogId);
+        }
+
+        // Comment like functionality
+        else if (e.target.closest('.comment-action')) {
+            const action = e.target.closest('.comment-action');
+            const icon = action.querySelector('.fa-heart');
+
+            if (icon) {
+                const count = action.querySelector('span');
+                let currentCount = parseInt(count.textContent.replace(/,/g, '')) || 0;
+
+                if (icon.classList.contains('far')) {
+                    icon.classList.replace('far', 'fas');
+                    count.textContent = currentCount + 1;
+                } else {
+                    icon.classList.replace('fas', 'far');
+                    count.textContent = currentCount - 1;
+                }
+            }
+        }
+
+        // Close options menus when clicking outside
+        else {
+            document.querySelectorAll('.options-menu').forEach(menu => {
+                menu.classList.remove('active');
+            });
+        }
+    });
+
+    // Open comments modal - FIXED to work with multiple modals
+    function openCommentsModal(blogId) {
+        // Find the specific modal for this blog post
+        const postCard = document.querySelector(`.post-card[data-post-id="${blogId}"]`);
+        if (postCard) {
+            const modal = postCard.querySelector('.comments-modal');
+            if (modal) {
+                modal.classList.add('active');
+                document.body.style.overflow = 'hidden';
+                loadComments(blogId, modal.querySelector('.comments-body'));
+
+                // Focus on comment input for better mobile experience
+                setTimeout(() => {
+                    const commentInput = modal.querySelector('.comment-input');
+                    if (commentInput) {
+                        commentInput.focus();
+                    }
+                }, 300);
+            }
+        }
+    }
+
+    // Fetch a post's comments the first time its modal is opened, then page on scroll
+    function loadComments(blogId, body) {
+        if (!body || body.getAttribute('data-loading') === 'true') {
+            return;
+        }
+        const loaded = body.getAttribute('data-loaded') === 'true';
+        const cursor = body.getAttribute('data-next-cursor') || '';
+        if ((loaded && !cursor) || (!loaded && body.getAttribute('data-comment-count') === '0')) {
+            return;
+        }
+        body.setAttribute('data-loading', 'true');
+        fetch(`/api/posts/${blogId}/comments?cursor=${encodeURIComponent(cursor)}`, { credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => {
+                body.insertAdjacentHTML('beforeend', data.html);
+                body.setAttribute('data-loaded', 'true');
+                body.setAttribute('data-next-cursor', data.next_cursor || '');
+            })
+            .catch(() => showNotification('Could not load comments.'))
+            .finally(() => body.removeAttribute('data-loading'));
+    }
+
+    document.addEventListener('scroll', function(e) {
+        const body = e.target.closest ? e.target.closest('.comments-body') : null;
+        if (body && body.scrollTop + body.clientHeight >= body.scrollHeight - 50) {
+            loadComments(body.id.replace('comments-list-', ''), body);
+        }
+    }, true);
+
+    // Post a comment without leaving the feed; the server returns the rendered comment and the new count
+    document.addEventListener('submit', function(e) {
+        const form = e.target.closest('.comments-modal .comment-form');
+        if (!form) {
+            return;
+        }
+        e.preventDefault();
+        const blogId = form.querySelector('input[name="blog_id"]').value;
+        const body = document.getElementById(`comments-list-${blogId}`);
+        const submit = form.querySelector('.comment-submit');
+        submit.disabled = true;
+        fetch(`/api/posts/${blogId}/comments`, { method: 'POST', body: new FormData(form), credentials: 'same-origin' })
+            .then(response => response.json().then(data => ({ ok: response.ok, data })))
+            .then(({ ok, data }) => {
+                if (!ok) {
+                    showNotification(data.error || 'Could not post your comment.');
+                    return;
+                }
+                const wasEmpty = body.getAttribute('data-comment-count') === '0';
+                // Append only when the thread is fully loaded; otherwise the next page brings it in
+                if (wasEmpty || (body.getAttribute('data-loaded') === 'true' && !body.getAttribute('data-next-cursor'))) {
+                    const placeholder = body.querySelector('.no-comments');
+                    if (placeholder) {
+                        placeholder.remove();
+                    }
+                    body.insertAdjacentHTML('beforeend', data.html);
+                    body.setAttribute('data-loaded', 'true');
+                    body.scrollTop = body.scrollHeight;
+                }
+                body.setAttribute('data-comment-count', data.count);
+                const count = document.querySelector(`.comment-btn[data-blog-id="${blogId}"] span`);
+                if (count) {
+                    count.textContent = data.count;
+                }
+                form.reset();
+            })
+            .catch(() => showNotification('Could not post your comment.'))
+            .finally(() => { submit.disabled = false; });
+    });
+
+    // Comments modal close functionality - FIXED for multiple modals
+    document.addEventListener('click', function(e) {
+        // Close comments modal when clicking close button
+        if (e.target.closest('.close-comments')) {
+            const closeBtn = e.target.closest('.close-comments');
+            const modal = closeBtn.closest('.comments-modal');
+            if (modal) {
+                modal.classList.remove('active');
+                document.body.style.overflow = 'auto';
+            }
+        }
+
+        // Close comments modal when clicking outside
+        if (e.target.classList.contains('comments-modal')) {
+            e.target.classList.remove('active');
+            document.body.style.overflow = 'auto';
+        }
+    });
+
+    // Content tabs functionality
+    const contentTabButtons = document.querySelectorAll('.content-tab');
+    contentTabButtons.forEach(tab => {
+        tab.addEventListener('click', function() {
+            contentTabButtons.forEach(t => t.classList.remove('active'));
+            this.classList.add('active');
+        });
+    });
+
+    // Infinite scroll - load the next feed page when the sentinel becomes visible
+    const feedSentinel = document.querySelector('.feed-sentinel');
+    let feedLoading = false;
+
+    function loadNextFeedPage() {
+        const cursor = feedSentinel.getAttribute('data-next-cursor');
+        if (!cursor || feedLoading) {
+            return;
+        }
+        feedLoading = true;
+        // Keeps a tag or category filter of the page
+        const filter = feedSentinel.getAttribute('data-feed-filter');
+        fetch(`/api/feed?cursor=${encodeURIComponent(cursor)}${filter ? '&' + filter : ''}`, { credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => {
+                feedSentinel.insertAdjacentHTML('beforebegin', data.html);
+                feedSentinel.setAttribute('data-next-cursor', data.next_cursor || '');
+                if (!data.next_cursor && feedObserver) {
+                    feedObserver.disconnect();
+                }
+            })
+            .catch(() => showNotification('Could not load more posts.'))
+            .finally(() => { feedLoading = false; });
+    }
+
+    let feedObserver = null;
+    if (feedSentinel && 'IntersectionObserver' in window) {
+        feedObserver = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextFeedPage();
+            }
+        }, { rootMargin: '600px 0px' });
+        feedObserver.observe(feedSentinel);
+    }
+
+    // Notification function
+    function showNotification(message) {
+        const toast = document.createElement('div');
+        toast.textContent = message;
+        toast.style.cssText = `
+            position: fixed;
+            bottom: 20px;
+            left: 50%;
+            transform: translateX(-50%) translateY(100px);
+            background: var(--black);
+            color: white;
+            padding: 12px 20px;
+            border-radius: 8px;
+            z-index: 10000;
+            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+            font-size: 0.9rem;
+            font-weight: 500;
+            opacity: 0;
+            transition: all 0.4s ease;
+            max-width: 90vw;
+            word-wrap: break-word;
+            text-align: center;
+        `;
+
+        document.body.appendChild(toast);
+
+        // Animate in
+        setTimeout(() => {
+            toast.style.opacity = '1';
+            toast.style.transform = 'translateX(-50%) translateY(0)';
+        }, 10);
+
+        // Animate out and remove
+        setTimeout(() => {
+            toast.style.opacity = '0';
+            toast.style.transform = 'translateX(-50%) translateY(-100px)';
+            setTimeout(() => {
+                if (toast.parentNode) {
+                    toast.parentNode.removeChild(toast);
+                }
+            }, 400);
+        }, 3000);
+    }
+});
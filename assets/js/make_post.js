@@ -0,0 +1,500 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Elements
+    const editor = document.getElementById('editor');
+    const postTitle = document.getElementById('postTitle');
+    const postContent = document.getElementById('postContent');
+    const imageUpload = document.getElementById('imageUpload');
+    const imageInput = document.getElementById('imageInput');
+    const imagePreview = document.getElementById('imagePreview');
+    const previewImage = document.getElementById('previewImage');
+    const toolbar = document.getElementById('toolbar');
+    const previewBtn = document.getElementById('previewBtn');
+    const publishBtn = document.getElementById('publishBtn');
+    const postForm = document.getElementById('postForm');
+    const previewModal = document.getElementById('previewModal');
+    const closePreview = document.getElementById('closePreview');
+    const previewArticle = document.getElementById('previewArticle');
+
+    // Character counters
+    const titleCount = document.getElementById('titleCount');
+    const contentCount = document.getElementById('contentCount');
+    const excerptCount = document.getElementById('excerptCount');
+
+    // Initialize
+    initCharacterCounters();
+    initRichTextEditor();
+    initImageUpload();
+    initPreviewFeature();
+    initTagsInput(); // Initialize the enhanced tags input
+
+    // Enhanced Tags Input Functionality
+    function initTagsInput() {
+        const tagsInput = document.getElementById('postTagsInput');
+        const tagsDisplay = document.getElementById('tagsDisplay');
+        const tagsHidden = document.getElementById('postTags');
+        const tagsCount = document.getElementById('tagsCount');
+        const tagsContainer = document.getElementById('tagsContainer');
+
+        let tags = [];
+        const MAX_TAGS = 10;
+
+        function updateTagsDisplay() {
+            tagsDisplay.innerHTML = '';
+            tags.forEach((tag, index) => {
+                const tagElement = document.createElement('div');
+                tagElement.className = 'tag-item';
+                tagElement.innerHTML = `
+                    ${escapeHtml(tag)}
+                    <button type="button" class="tag-remove" data-index="${index}">
+                        <i class="fas fa-times"></i>
+                    </button>
+                `;
+                tagsDisplay.appendChild(tagElement);
+            });
+
+            tagsHidden.value = tags.join(',');
+            tagsCount.textContent = `${tags.length}/${MAX_TAGS} tags`;
+
+            if (tags.length >= MAX_TAGS) {
+                tagsCount.classList.add('warning');
+                tagsInput.placeholder = 'Maximum tags reached';
+                tagsInput.disabled = true;
+            } else {
+                tagsCount.classList.remove('warning');
+                tagsInput.placeholder = 'Type a tag and press Enter, comma, or space...';
+                tagsInput.disabled = false;
+            }
+        }
+
+        function addTag(tag) {
+            const cleanTag = tag.trim().toLowerCase();
+
+            // Validate tag
+            if (!cleanTag) return false;
+            if (cleanTag.length < 2) {
+                showToast('Tags must be at least 2 characters long', 'error');
+                return false;
+            }
+            if (cleanTag.length > 30) {
+                showToast('Tags cannot exceed 30 characters', 'error');
+                return false;
+            }
+            if (tags.includes(cleanTag)) {
+                showToast('Tag already added', 'error');
+                return false;
+            }
+            if (tags.length >= MAX_TAGS) {
+                showToast(`Maximum ${MAX_TAGS} tags allowed`, 'error');
+                return false;
+            }
+
+            tags.push(cleanTag);
+            updateTagsDisplay();
+            showToast(`Tag "${cleanTag}" added`, 'success');
+            return true;
+        }
+
+        function removeTag(index) {
+            const removedTag = tags[index];
+            tags.splice(index, 1);
+            updateTagsDisplay();
+            showToast(`Tag "${removedTag}" removed`, 'success');
+        }
+
+        // Event listeners for tags input
+        tagsInput.addEventListener('keydown', function(e) {
+            if ((e.key === 'Enter' || e.key === ',' || e.key === ' ') && this.value.trim()) {
+                e.preventDefault();
+                if (addTag(this.value)) {
+                    this.value = '';
+                }
+            }
+
+            // Backspace to remove last tag
+            if (e.key === 'Backspace' && this.value === '' && tags.length > 0) {
+                removeTag(tags.length - 1);
+            }
+        });
+
+        tagsInput.addEventListener('blur', function() {
+            if (this.value.trim()) {
+                if (addTag(this.value)) {
+                    this.value = '';
+                }
+            }
+        });
+
+        // Click on container to focus input
+        tagsContainer.addEventListener('click', function() {
+            tagsInput.focus();
+        });
+
+        // Remove tag when X is clicked
+        tagsDisplay.addEventListener('click', function(e) {
+            if (e.target.closest('.tag-remove')) {
+                const index = parseInt(e.target.closest('.tag-remove').dataset.index);
+                removeTag(index);
+            }
+        });
+
+        // Initialize with any existing tags from form submission errors
+        const existingTags = tagsHidden.value;
+        if (existingTags) {
+            tags = existingTags.split(',').filter(tag => tag.trim());
+            updateTagsDisplay();
+        }
+    }
+
+    // Character Counters
+    function initCharacterCounters() {
+        const postExcerpt = document.getElementById('postExcerpt');
+
+        updateCounter(titleCount, postTitle.value.length, 120);
+        updateCounter(contentCount, editor.textContent.length, 10000);
+        updateCounter(excerptCount, postExcerpt.value.length, 200);
+
+        postTitle.addEventListener('input', () => {
+            updateCounter(titleCount, postTitle.value.length, 120);
+        });
+
+        editor.addEventListener('input', () => {
+            updateCounter(contentCount, editor.textContent.length, 10000);
+        });
+
+        postExcerpt.addEventListener('input', () => {
+            updateCounter(excerptCount, postExcerpt.value.length, 200);
+        });
+    }
+
+    function updateCounter(counter, current, max) {
+        counter.textContent = `${current}/${max}`;
+        if (current > max * 0.9) {
+            counter.style.color = '#ef4444';
+        } else if (current > max * 0.75) {
+            counter.style.color = '#f59e0b';
+        } else {
+            counter.style.color = 'var(--medium-gray)';
+        }
+    }
+
+    // Rich Text Editor
+    function initRichTextEditor() {
+        // Toolbar functionality
+        toolbar.addEventListener('click', function(e) {
+            if (e.target.closest('.toolbar-btn')) {
+                const button = e.target.closest('.toolbar-btn');
+                const command = button.dataset.command;
+                const value = button.dataset.value;
+
+                e.preventDefault();
+                editor.focus();
+
+                if (command === 'code') {
+                    insertCodeBlock();
+                } else if (command === 'quote') {
+                    insertQuote();
+                } else if (command === 'createLink') {
+                    insertLink();
+                } else {
+                    document.execCommand(command, false, value);
+                }
+
+                // Update active state for format buttons
+                if (['bold', 'italic', 'underline'].includes(command)) {
+                    button.classList.toggle('active');
+                }
+            }
+        });
+
+        // Update hidden content field before form submission
+        postForm.addEventListener('submit', function() {
+            postContent.value = editor.innerHTML;
+
+            // Show loading state
+            publishBtn.classList.add('loading');
+            publishBtn.disabled = true;
+            publishBtn.innerHTML = '<i class="fas fa-spinner"></i> Publishing...';
+        });
+    }
+
+    function insertCodeBlock() {
+        const selection = window.getSelection();
+        if (selection.rangeCount > 0) {
+            const range = selection.getRangeAt(0);
+
+            // Create a pre element with code inside
+            const pre = document.createElement('pre');
+            const code = document.createElement('code');
+
+            // If there's selected text, use it as the code content
+            if (!selection.toString().trim()) {
+                code.textContent = '// Write your code here\nfunction example() {\n    return "Hello World!";\n}';
+            } else {
+                code.textContent = selection.toString();
+            }
+
+            pre.appendChild(code);
+
+            // Insert the code block
+            range.deleteContents();
+            range.insertNode(pre);
+
+            // Move cursor inside the code block
+            const newRange = document.createRange();
+            newRange.setStart(code, 0);
+            newRange.collapse(true);
+            selection.removeAllRanges();
+            selection.addRange(newRange);
+        }
+    }
+
+    function insertQuote() {
+        const selection = window.getSelection();
+        if (selection.rangeCount > 0) {
+            const range = selection.getRangeAt(0);
+            const blockquote = document.createElement('blockquote');
+
+            if (!selection.toString().trim()) {
+                blockquote.textContent = 'Write your quote here...';
+            } else {
+                blockquote.textContent = selection.toString();
+                range.deleteContents();
+            }
+
+            range.insertNode(blockquote);
+
+            // Move cursor after the quote
+            const newRange = document.createRange();
+            newRange.setStartAfter(blockquote);
+            newRange.collapse(true);
+            selection.removeAllRanges();
+            selection.addRange(newRange);
+        }
+    }
+
+    function insertLink() {
+        const url = prompt('Enter URL:');
+        if (url) {
+            document.execCommand('createLink', false, url);
+        }
+    }
+
+    // Image Upload with Drag & Drop
+    function initImageUpload() {
+        // Click to upload
+        imageUpload.addEventListener('click', function(e) {
+            if (e.target.type !== 'file') {
+                imageInput.click();
+            }
+        });
+
+        // Drag and drop
+        ['dragenter', 'dragover', 'dragleave', 'drop'].forEach(eventName => {
+            imageUpload.addEventListener(eventName, preventDefaults, false);
+        });
+
+        function preventDefaults(e) {
+            e.preventDefault();
+            e.stopPropagation();
+        }
+
+        ['dragenter', 'dragover'].forEach(eventName => {
+            imageUpload.addEventListener(eventName, highlight, false);
+        });
+
+        ['dragleave', 'drop'].forEach(eventName => {
+            imageUpload.addEventListener(eventName, unhighlight, false);
+        });
+
+        function highlight() {
+            imageUpload.classList.add('drag-over');
+        }
+
+        function unhighlight() {
+            imageUpload.classList.remove('drag-over');
+        }
+
+        imageUpload.addEventListener('drop', handleDrop, false);
+
+        function handleDrop(e) {
+            const dt = e.dataTransfer;
+            const files = dt.files;
+            if (files.length > 0) {
+                handleImageUpload(files[0]);
+            }
+        }
+
+        imageInput.addEventListener('change', function() {
+            if (this.files && this.files[0]) {
+                handleImageUpload(this.files[0]);
+            }
+        });
+    }
+
+    function handleImageUpload(file) {
+        // Validate file type
+        if (!file.type.match('image/jpeg') && !file.type.match('image/png')) {
+            showToast('Please upload JPG or PNG images only', 'error');
+            return;
+        }
+
+        // Validate file size (5MB)
+        if (file.size > 5 * 1024 * 1024) {
+            showToast('Image size should be less than 5MB', 'error');
+            return;
+        }
+
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            previewImage.src = e.target.result;
+            imagePreview.style.display = 'block';
+            imageUpload.style.display = 'none';
+            showToast('Image uploaded successfully!', 'success');
+        };
+        reader.readAsDataURL(file);
+    }
+
+    // Preview Feature
+    function initPreviewFeature() {
+        previewBtn.addEventListener('click', showPreview);
+        closePreview.addEventListener('click', closePreviewModal);
+
+        // Close preview when clicking outside
+        previewModal.addEventListener('click', function(e) {
+            if (e.target === previewModal) {
+                closePreviewModal();
+            }
+        });
+
+        // Close preview with Escape key
+        document.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape' && previewModal.classList.contains('active')) {
+                closePreviewModal();
+            }
+        });
+    }
+
+    function showPreview() {
+        const title = postTitle.value.trim();
+        const content = editor.innerHTML;
+        const excerpt = document.getElementById('postExcerpt').value;
+        const category = document.getElementById('postCategory').value;
+        const tags = document.getElementById('postTags').value;
+        const hasImage = imagePreview.style.display !== 'none';
+
+        if (!title) {
+            showToast('Please add a title to preview your post', 'error');
+            postTitle.focus();
+            return;
+        }
+
+        if (editor.textContent.trim().length < 10) {
+            showToast('Please add some content to preview your post', 'error');
+            editor.focus();
+            return;
+        }
+
+        // Generate preview content
+        let previewHTML = `
+            <h1>${escapeHtml(title)}</h1>
+
+            <div class="meta">
+                <span><i class="fas fa-user"></i> By You</span>
+                <span>•</span>
+                <span><i class="fas fa-calendar"></i> ${new Date().toLocaleDateString()}</span>
+                <span>•</span>
+                <span><i class="fas fa-clock"></i> ${calculateReadingTime()} min read</span>
+                ${category ? `<span>•</span><span><i class="fas fa-folder"></i> ${escapeHtml(category)}</span>` : ''}
+            </div>
+        `;
+
+        if (hasImage) {
+            previewHTML += `<img src="${previewImage.src}" alt="${escapeHtml(title)}" class="featured-image">`;
+        }
+
+        if (excerpt) {
+            previewHTML += `<div style="font-style: italic; color: var(--medium-gray); margin-bottom: 2rem; padding: 1rem; background: var(--light-gray); border-radius: 6px;">${escapeHtml(excerpt)}</div>`;
+        }
+
+        previewHTML += `<div class="content">${content}</div>`;
+
+        if (tags) {
+            const tagArray = tags.split(',').filter(tag => tag.trim());
+            if (tagArray.length > 0) {
+                previewHTML += `
+                    <div class="tags">
+                        <strong>Tags:</strong>
+                        ${tagArray.map(tag => `<span class="tag">${escapeHtml(tag)}</span>`).join('')}
+                    </div>
+                `;
+            }
+        }
+
+        previewArticle.innerHTML = previewHTML;
+        previewModal.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+
+    function closePreviewModal() {
+        previewModal.classList.remove('active');
+        document.body.style.overflow = 'auto';
+    }
+
+    function escapeHtml(unsafe) {
+        return unsafe
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/"/g, "&quot;")
+            .replace(/'/g, "&#039;");
+    }
+
+    function calculateReadingTime() {
+        const text = editor.textContent || editor.innerText;
+        const words = text.trim().split(/\s+/).length;
+        return Math.max(1, Math.ceil(words / 200));
+    }
+
+    // Toast Notification
+    function showToast(message, type = '') {
+        const toast = document.createElement('div');
+        toast.className = `toast ${type}`;
+        toast.textContent = message;
+        document.body.appendChild(toast);
+
+        setTimeout(() => {
+            toast.classList.add('show');
+        }, 100);
+
+        setTimeout(() => {
+            toast.classList.remove('show');
+            setTimeout(() => {
+                if (toast.parentNode) {
+                    toast.parentNode.removeChild(toast);
+                }
+            }, 400);
+        }, 3000);
+    }
+
+    // Add subtle animation to form
+    const form = document.querySelector('.post-form');
+    form.style.opacity = '0';
+    form.style.transform = 'translateY(20px)';
+
+    setTimeout(() => {
+        form.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+        form.style.opacity = '1';
+        form.style.transform = 'translateY(0)';
+    }, 100);
+});
+
+// Image preview functionality
+function removeImagePreview() {
+    const imagePreview = document.getElementById('imagePreview');
+    const imageUpload = document.getElementById('imageUpload');
+    const imageInput = document.getElementById('imageInput');
+
+    imagePreview.style.display = 'none';
+    imageUpload.style.display = 'block';
+    imageInput.value = '';
+}
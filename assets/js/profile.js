@@ -0,0 +1,209 @@
+// Enhanced JavaScript functionality with smooth interactions
+class ProfileInteractions {
+    constructor() {
+        this.initEventListeners();
+        this.initHoverEffects();
+    }
+
+    initEventListeners() {
+        // Add click listeners for interactive elements
+        document.addEventListener('click', this.handleGlobalClick.bind(this));
+    }
+
+    initHoverEffects() {
+        // Initialize hover effects for better UX
+        this.addRippleEffects();
+    }
+
+    handleGlobalClick(e) {
+        // Handle post interactions
+        if (e.target.closest('.like-btn')) {
+            this.handleLikePost(e);
+        }
+        if (e.target.closest('.bookmark-btn')) {
+            this.handleBookmarkPost(e);
+        }
+        if (e.target.closest('.comment-btn')) {
+            this.handleShowComments(e);
+        }
+    }
+
+    handleLikePost(e) {
+        e.stopPropagation();
+        const likeBtn = e.target.closest('.post-stat');
+        const icon = likeBtn.querySelector('i');
+        const count = likeBtn.querySelector('span');
+        let currentCount = parseInt(count.textContent);
+
+        if (icon.classList.contains('far')) {
+            icon.classList.replace('far', 'fas');
+            icon.style.color = '#ff4757';
+            count.textContent = currentCount + 1;
+            likeBtn.classList.add('active');
+            this.createRippleEffect(likeBtn, e);
+        } else {
+            icon.classList.replace('fas', 'far');
+            icon.style.color = '';
+            count.textContent = currentCount - 1;
+            likeBtn.classList.remove('active');
+        }
+    }
+
+    handleBookmarkPost(e) {
+        e.stopPropagation();
+        const bookmarkBtn = e.target.closest('.post-stat');
+        const icon = bookmarkBtn.querySelector('i');
+
+        if (icon.classList.contains('far')) {
+            icon.classList.replace('far', 'fas');
+            this.createRippleEffect(bookmarkBtn, e);
+        } else {
+            icon.classList.replace('fas', 'far');
+        }
+    }
+
+    handleShowComments(e) {
+        e.stopPropagation();
+        // In real app, this would open comments modal
+        console.log('Show comments');
+    }
+
+    createRippleEffect(element, event) {
+        const ripple = document.createElement('span');
+        const rect = element.getBoundingClientRect();
+        const size = Math.max(rect.width, rect.height);
+        const x = event.clientX - rect.left - size / 2;
+        const y = event.clientY - rect.top - size / 2;
+
+        ripple.style.cssText = `
+            position: absolute;
+            border-radius: 50%;
+            background: rgba(0, 0, 0, 0.1);
+            transform: scale(0);
+            animation: ripple 0.6s linear;
+            width: ${size}px;
+            height: ${size}px;
+            left: ${x}px;
+            top: ${y}px;
+            pointer-events: none;
+        `;
+
+        element.style.position = 'relative';
+        element.style.overflow = 'hidden';
+        element.appendChild(ripple);
+
+        setTimeout(() => ripple.remove(), 600);
+    }
+
+    addRippleEffects() {
+        // Add ripple effect to buttons
+        document.addEventListener('click', (e) => {
+            if (e.target.closest('.btn')) {
+                const btn = e.target.closest('.btn');
+                this.createRippleEffect(btn, e);
+            }
+        });
+    }
+}
+
+// Global functions
+function handleImageError(img) {
+    img.style.display = 'none';
+    const avatarDiv = document.createElement('div');
+    avatarDiv.className = 'profile-avatar';
+    avatarDiv.innerHTML = '<i class="fas fa-user"></i>';
+    img.parentNode.insertBefore(avatarDiv, img.nextSibling);
+}
+
+function openAvatarEditor() {
+    // In real app, this would open avatar editor
+    console.log('Open avatar editor');
+}
+
+function handleStatClick(statType) {
+    // Handle stat clicks with visual feedback
+    const stat = event.currentTarget;
+    stat.style.transform = 'scale(0.95)';
+    setTimeout(() => {
+        stat.style.transform = '';
+    }, 150);
+
+    console.log('Stat clicked:', statType);
+}
+
+function handleInfoClick(field) {
+    // Handle info item clicks
+    const item = event.currentTarget;
+    item.style.background = 'var(--light-gray)';
+    setTimeout(() => {
+        item.style.background = '';
+    }, 300);
+
+    console.log('Info field clicked:', field);
+}
+
+function handleSkillClick(skill) {
+    // Handle skill tag clicks
+    const tag = event.currentTarget;
+    tag.style.transform = 'scale(0.95)';
+    setTimeout(() => {
+        tag.style.transform = '';
+    }, 150);
+
+    console.log('Skill clicked:', skill);
+}
+
+function shareProfile() {
+    if (navigator.share) {
+        const name = document.querySelector('.profile-name').dataset.shareName;
+        navigator.share({
+            title: `${name || 'User'} Profile`,
+            text: `Check out ${name || 'this user'}'s profile!`,
+            url: window.location.href
+        });
+    } else {
+        // Fallback: copy to clipboard
+        navigator.clipboard.writeText(window.location.href);
+    }
+}
+
+function openLink(url) {
+    window.open(url, '_blank');
+}
+
+function viewPost(postId) {
+    // In real app, this would navigate to the post
+    console.log('Viewing post:', postId);
+}
+
+function likePost(event, postId) {
+    event.stopPropagation();
+    // This will be handled by the ProfileInteractions class
+}
+
+function bookmarkPost(event, postId) {
+    event.stopPropagation();
+    // This will be handled by the ProfileInteractions class
+}
+
+function showComments(event, postId) {
+    event.stopPropagation();
+    // This will be handled by the ProfileInteractions class
+}
+
+// Initialize when DOM is loaded
+document.addEventListener('DOMContentLoaded', function() {
+    new ProfileInteractions();
+
+    // Add CSS for ripple animation
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes ripple {
+            to {
+                transform: scale(4);
+                opacity: 0;
+            }
+        }
+    `;
+    document.head.appendChild(style);
+});
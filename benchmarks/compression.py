@@ -0,0 +1,97 @@
+"""Bytes on the wire and CPU per request for home_page with and without compression.
+
+    python benchmarks/compression.py --sizes 10 20 50 --requests 50
+
+Runs against a throwaway SQLite database through the Flask test client, so
+the numbers cover rendering plus compression in this process and nothing of
+the network or gunicorn.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def setup_app(db_path, max_size):
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.environ['FEED_MAX_PAGE_SIZE'] = str(max_size)
+    os.environ.pop('COMPRESS_RESPONSES', None)
+    os.chdir(ROOT)
+    import main
+    from routes.models_routes import db, User, Post, Comment
+
+    app = main.app
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    client.post('/signup', data={'fullname': 'Bench Reader', 'email': 'bench@example.com', 'password': 'bench'})
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'bench'})
+
+    paragraph = ("<p>Performance work starts with measuring what the page actually sends and what it "
+                 "costs to produce, and only then deciding what to change.</p>")
+    with app.app_context():
+        user = User.query.filter_by(email='bench@example.com').one()
+        start = datetime(2024, 1, 1)
+        posts = [Post(user_id=user.id, title=f"Benchmark post number {i}", content=paragraph * 12,
+                      date=start + timedelta(minutes=i)) for i in range(max_size)]
+        db.session.add_all(posts)
+        db.session.flush()
+        db.session.add_all(Comment(user_id=user.id, blog_id=post.id, content='Nice read')
+                           for post in posts[::3])
+        db.session.commit()
+    return app, client
+
+
+def measure(client, requests, accept_encoding):
+    headers = {'Accept-Encoding': accept_encoding}
+    response = client.get('/', headers=headers)  # warms the fragment cache
+    assert response.status_code == 200, response.status_code
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get('/', headers=headers)
+    cpu_ms = (time.process_time() - started) * 1000 / requests
+    return len(response.data), response.headers.get('Content-Encoding') or 'identity', cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20, 50, 100])
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    from routes.compression import CompressionMiddleware, brotli
+
+    configs = [('identity', 'identity', {}),
+               ('gzip-1', 'gzip', {'gzip_level': 1}),
+               ('gzip-6', 'gzip', {'gzip_level': 6}),
+               ('gzip-9', 'gzip', {'gzip_level': 9})]
+    if brotli is not None:
+        configs += [('br-4', 'br', {'brotli_level': 4}), ('br-11', 'br', {'brotli_level': 11})]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, client = setup_app(os.path.join(tmp, 'bench.db'), max(args.sizes))
+        plain_app = app.wsgi_app
+        print(f"{'posts':>5}  {'config':8}  {'bytes':>8}  {'ratio':>6}  {'cpu ms/req':>10}  {'+ms vs identity':>15}")
+        for size in args.sizes:
+            app.config['FEED_PAGE_SIZE'] = size
+            baseline_bytes = baseline_ms = None
+            for label, token, options in configs:
+                app.wsgi_app = CompressionMiddleware(plain_app, **options)
+                size_bytes, encoding, cpu_ms = measure(client, args.requests, token)
+                assert encoding == token, (label, encoding)
+                if baseline_bytes is None:
+                    baseline_bytes, baseline_ms = size_bytes, cpu_ms
+                print(f"{size:>5}  {label:8}  {size_bytes:>8}  {size_bytes / baseline_bytes:>6.3f}  "
+                      f"{cpu_ms:>10.2f}  {cpu_ms - baseline_ms:>+15.2f}")
+        app.wsgi_app = plain_app
+
+
+if __name__ == '__main__':
+    main()
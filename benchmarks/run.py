@@ -0,0 +1,317 @@
+"""Latency, queries per request and peak RSS for the main pages.
+
+Seed a database first, then point the harness at it:
+
+    DATABASE_URL=sqlite:////tmp/bench.db flask --app main seed --scale medium
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/run.py --output results.json
+
+By default requests go through the Flask test client in this process. With
+--gunicorn the harness starts `gunicorn main:app` on a local port and drives
+it over HTTP instead (--url targets a server that is already running). Query
+counts over HTTP come from the server's /metrics, so start it with
+METRICS_ENABLED=1 to get them; peak RSS is then read from the gunicorn
+processes rather than this one.
+
+Pass --compare with an earlier results file to print the change per scenario.
+The comment scenario writes to the database, so reseed before comparing runs.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ('home_page', 'post_detail', 'user_profile', 'comment', 'login_page')
+
+
+# ---------------------- TARGETS ----------------------
+class ClientTarget:
+    """Requests through the Flask test client; queries are counted with an engine listener."""
+
+    def __init__(self, app):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        self.app = app
+        self.client = app.test_client()
+        self.anonymous = app.test_client(use_cookies=False)
+        self.queries = 0
+
+        def count(*args):
+            self.queries += 1
+        event.listen(Engine, 'before_cursor_execute', count)
+
+    def login(self, email, password):
+        response = self.client.post('/login', data={'email': email, 'password': password})
+        response.close()
+        return response.status_code == 302
+
+    def request(self, method, path, data=None, anonymous=False):
+        client = self.anonymous if anonymous else self.client
+        before = self.queries
+        started = time.perf_counter()
+        response = client.open(path, method=method, data=data)
+        response.get_data()
+        response.close()
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, self.queries - before
+
+    def peak_rss_kb(self):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def query_totals(self):
+        return None
+
+
+class HttpTarget:
+    """Requests over HTTP to a running server; queries are read from its /metrics."""
+
+    def __init__(self, base_url, server=None):
+        self.base_url = base_url.rstrip('/')
+        self.server = server
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+                                                  NoRedirect)
+        self.anonymous = urllib.request.build_opener(NoRedirect)
+
+    def _open(self, opener, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with opener.open(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code
+
+    def login(self, email, password):
+        return self._open(self.opener, 'POST', '/login', {'email': email, 'password': password}) == 302
+
+    def request(self, method, path, data=None, anonymous=False):
+        started = time.perf_counter()
+        status = self._open(self.anonymous if anonymous else self.opener, method, path, data)
+        return status, time.perf_counter() - started, None
+
+    def query_totals(self):
+        """{endpoint: (queries, requests)} from /metrics, or None if the server does not expose them."""
+        try:
+            with self.anonymous.open(self.base_url + '/metrics') as response:
+                text = response.read().decode('utf-8')
+        except urllib.error.URLError:
+            return None
+        totals = {}
+        for kind, endpoint, value in re.findall(
+                r'^http_request_sql_queries_(sum|count)\{endpoint="([^"]+)"\} (\S+)$', text, re.M):
+            queries, requests = totals.get(endpoint, (0, 0))
+            totals[endpoint] = (float(value), requests) if kind == 'sum' else (queries, float(value))
+        return totals
+
+    def peak_rss_kb(self):
+        if self.server is None:
+            return None
+        return sum(_peak_rss_kb(pid) for pid in [self.server.pid] + _children(self.server.pid))
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        children.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return children
+
+
+def _peak_rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            match = re.search(r'^VmHWM:\s+(\d+) kB', f.read(), re.M)
+        return int(match.group(1)) if match else 0
+    except OSError:
+        return 0
+
+
+def start_gunicorn(port, workers):
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'main:app', '-w', str(workers),
+                               '-b', f'127.0.0.1:{port}'], cwd=ROOT)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + '/landing_page').close()
+            return server, base_url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    server.terminate()
+    raise SystemExit('gunicorn did not start')
+
+
+# ---------------------- SCENARIOS ----------------------
+def scenario_requests(name, rng, post_ids, credentials):
+    """Return a function producing (method, path, data, anonymous) for one request of a scenario."""
+    if name == 'home_page':
+        return lambda: ('GET', '/', None, False)
+    if name == 'post_detail':
+        return lambda: ('GET', f'/post_detail/{rng.choice(post_ids)}', None, False)
+    if name == 'user_profile':
+        return lambda: ('GET', '/profile', None, False)
+    if name == 'comment':
+        return lambda: ('POST', '/comment', {'blog_id': rng.choice(post_ids), 'content': 'Benchmark comment'}, False)
+    if name == 'login_page':
+        email, password = credentials
+        return lambda: ('POST', '/login', {'email': email, 'password': password}, True)
+    raise ValueError(name)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile."""
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(target, name, make_request, requests, warmup):
+    for _ in range(warmup):
+        target.request(*make_request())
+    before = target.query_totals()
+    latencies, queries, errors = [], [], 0
+    for _ in range(requests):
+        method, path, data, anonymous = make_request()
+        status, elapsed, query_count = target.request(method, path, data, anonymous)
+        if status >= 400:
+            errors += 1
+        latencies.append(elapsed * 1000)
+        if query_count is not None:
+            queries.append(query_count)
+    if not queries and before is not None:
+        after = target.query_totals() or {}
+        total, count = (after.get(name, (0, 0))[i] - before.get(name, (0, 0))[i] for i in (0, 1))
+        queries = [total / count] if count else []
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    print(f"\nChange against {previous.get('commit') or 'previous run'}:")
+    for name, result in current['scenarios'].items():
+        old = previous.get('scenarios', {}).get(name)
+        if not old:
+            continue
+        changes = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request'):
+            if old.get(key) and result.get(key) is not None:
+                changes.append(f"{key} {(result[key] - old[key]) / old[key]:+.1%}")
+        print(f"  {name:14} {', '.join(changes)}")
+    if previous.get('peak_rss_kb') and current.get('peak_rss_kb'):
+        print(f"  {'peak RSS':14} {(current['peak_rss_kb'] - previous['peak_rss_kb']) / previous['peak_rss_kb']:+.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the main pages against a seeded database.')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario.')
+    parser.add_argument('--login-requests', type=int, default=20, help='Measured requests for login_page (bcrypt).')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--gunicorn', action='store_true', help='Start a local gunicorn and drive it over HTTP.')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers with --gunicorn.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--url', help='Drive an already running server instead.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--compare', help='Earlier results file to compare against.')
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    import main as application
+    from routes.models_routes import User, Post, db
+    from routes.seed import SEED_EMAIL, SEED_PASSWORD
+
+    app = application.app
+    with app.app_context():
+        user = User.query.filter_by(email=SEED_EMAIL.format(0)).first()
+        if user is None:
+            raise SystemExit('No seeded users found; run `flask --app main seed` against this database first.')
+        post_ids = db.session.scalars(db.select(Post.id)).all()
+    credentials = (SEED_EMAIL.format(0), SEED_PASSWORD)
+
+    server = None
+    if args.gunicorn:
+        server, base_url = start_gunicorn(args.port, args.workers)
+        target = HttpTarget(base_url, server)
+    elif args.url:
+        target = HttpTarget(args.url)
+    else:
+        target = ClientTarget(app)
+
+    try:
+        if not target.login(*credentials):
+            raise SystemExit(f"Could not log in as {credentials[0]}")
+        rng = random.Random(args.seed)
+        results = {
+            'commit': git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'target': 'gunicorn' if args.gunicorn else args.url or 'test-client',
+            'posts': len(post_ids),
+            'scenarios': {},
+        }
+        for name in args.scenarios:
+            requests = args.login_requests if name == 'login_page' else args.requests
+            result = run_scenario(target, name, scenario_requests(name, rng, post_ids, credentials), requests,
+                                  min(args.warmup, requests))
+            results['scenarios'][name] = result
+            print(f"{name:14} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                  f"p99 {result['p99_ms']:8.2f} ms  queries/req {result['queries_per_request']}  "
+                  f"errors {result['errors']}")
+        results['peak_rss_kb'] = target.peak_rss_kb()
+        print(f"peak RSS {results['peak_rss_kb']} kB")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Search latency with the full-text index against a LIKE scan of the post table.
+
+    python benchmarks/search.py --posts 100000 --requests 50
+
+Seeds a throwaway SQLite database with `seed_database`, times the index
+rebuild, then runs each query through `search_posts` and through the
+`title LIKE '%q%' OR content LIKE '%q%'` scan it replaces, reporting p50 and
+p95 per query in this process.
+
+The seeded posts share a vocabulary of a few dozen words, so the common
+queries match most posts: the index has to rank all of them while the LIKE
+scan stops at the first page of newest posts, unranked. Terms that are not
+in the vocabulary show the other end, where LIKE reads every post.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUERIES = ('latency', 'database index', 'stream feed render', 'perf', 'flask template signal', 'kubernetes',
+           'latency kubernetes')
+
+
+def setup_app(db_path):
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.chdir(ROOT)
+    import main
+    from routes.models_routes import db
+
+    app = main.app
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def like_search(q, limit):
+    from sqlalchemy import or_
+    from routes.models_routes import Post, User, db
+
+    pattern = f"%{q}%"
+    return (db.session.query(Post.id, Post.title, Post.date, User.fullname)
+            .join(User, User.id == Post.user_id)
+            .filter(or_(Post.title.like(pattern), Post.content.like(pattern)))
+            .order_by(Post.date.desc()).limit(limit).all())
+
+
+def timed(function, requests):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--queries', nargs='+', default=list(QUERIES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = setup_app(os.path.join(tmp, 'bench.db'))
+        from routes.seed import seed_database
+        from routes.search import rebuild_search_index, search_posts
+
+        with app.app_context():
+            seed_database(args.users, args.posts, 0, 1.1, 365, 5000, random.Random(1))
+            started = time.perf_counter()
+            indexed = rebuild_search_index(batch_size=5000)
+            print(f"Indexed {indexed} posts in {time.perf_counter() - started:.1f} s")
+            print(f"{'query':24}  {'fts p50':>8}  {'fts p95':>8}  {'like p50':>8}  {'like p95':>8}  {'hits':>5}")
+            for q in args.queries:
+                hits = len(search_posts(q, args.limit)[0])
+                fts = timed(lambda: search_posts(q, args.limit), args.requests)
+                like = timed(lambda: like_search(q, args.limit), args.requests)
+                print(f"{q:24}  {fts[0]:>8.2f}  {fts[1]:>8.2f}  {like[0]:>8.2f}  {like[1]:>8.2f}  {hits:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,25 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, make_response
 from flask_bcrypt import Bcrypt
-from flask_login import LoginManager, current_user, logout_user
+from flask_login import LoginManager, current_user, logout_user, login_required
+from flask_migrate import Migrate
+from sqlalchemy.orm import joinedload
 from dotenv import load_dotenv
-from routes.models_routes import User, Link, Skill, Post, Comment, db
+from routes.models_routes import Link, Skill, Post, Comment, db
+from routes.feed import with_authors_and_comments, iter_comments, comment_counts, serialize_detail_comment
+from routes.fragment_cache import fragment_cache
+from routes.session_users import load_session_user, init_session_user_cache
+from routes.password_hashing import password_hasher
+from routes.image_variants import image_variants
+from routes.http_caching import init_http_caching, post_validators, not_modified
+from routes.assets import assets, asset_commands
+from routes.compression import init_compression
+from routes.streaming import streaming_enabled, stream_page
+from routes.instrumentation import instrumentation
+from routes.comments import add_comment
+from routes.search import exclude_search_index
+from routes.trending import init_trending, trending_commands
+from routes.db_routing import database_url, engine_options, REPLICA_BIND
 
 # Load environment variables
 load_dotenv()
@@ -11,12 +27,28 @@ app = Flask(__name__)
 # ====================== CONFIGURATION ======================
 app.secret_key = os.environ.get("SECRET_KEY", "fallback-secret-key-for-development")
 
-db_url = os.environ.get("DATABASE_URL")
-if db_url and db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql+psycopg2://", 1)
+db_url = database_url(os.environ.get("DATABASE_URL"))
 
 app.config['SQLALCHEMY_DATABASE_URI'] = db_url or "sqlite:///local_database.db"
 
+# Engine pool: pre-ping and recycle keep idle connections from going stale; size, overflow and
+# timeout (seconds) apply to server databases; statement timeout in ms (0 = none, Postgres only)
+app.config['DATABASE_POOL_SIZE'] = int(os.environ.get("DATABASE_POOL_SIZE", 5))
+app.config['DATABASE_MAX_OVERFLOW'] = int(os.environ.get("DATABASE_MAX_OVERFLOW", 10))
+app.config['DATABASE_POOL_TIMEOUT'] = int(os.environ.get("DATABASE_POOL_TIMEOUT", 30))
+app.config['DATABASE_POOL_RECYCLE'] = int(os.environ.get("DATABASE_POOL_RECYCLE", 1800))
+app.config['DATABASE_POOL_PRE_PING'] = os.environ.get("DATABASE_POOL_PRE_PING", "1") == "1"
+app.config['DATABASE_STATEMENT_TIMEOUT'] = int(os.environ.get("DATABASE_STATEMENT_TIMEOUT", 0))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+
+# Read replica for the reads of read-only GET endpoints; unset, everything uses the primary.
+# Locally: DATABASE_URL=sqlite:////tmp/primary.db DATABASE_REPLICA_URL=sqlite:////tmp/replica.db
+replica_url = database_url(os.environ.get("DATABASE_REPLICA_URL"))
+app.config['READ_REPLICA_ENDPOINTS'] = os.environ.get(
+    "READ_REPLICA_ENDPOINTS", "home_page,post_detail,user_profile").split(',')
+if replica_url:
+    app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: {'url': replica_url, **engine_options(replica_url, app.config)}}
+
 # Upload folders
 app.config['UPLOAD_FOLDER'] = 'static/profile_pics'
 app.config['FEATURED_IMAGE_FOLDER'] = 'static/featured_images'
@@ -27,32 +59,104 @@ os.makedirs(app.config['FEATURED_IMAGE_FOLDER'], exist_ok=True)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 1000 MB
 app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
 
+# Home feed pagination
+app.config['FEED_PAGE_SIZE'] = int(os.environ.get("FEED_PAGE_SIZE", 20))
+app.config['FEED_MAX_PAGE_SIZE'] = int(os.environ.get("FEED_MAX_PAGE_SIZE", 50))
+app.config['COMMENTS_PAGE_SIZE'] = int(os.environ.get("COMMENTS_PAGE_SIZE", 20))
+app.config['PROFILE_PAGE_SIZE'] = int(os.environ.get("PROFILE_PAGE_SIZE", 12))
+app.config['TAG_CLOUD_SIZE'] = int(os.environ.get("TAG_CLOUD_SIZE", 30))
+
+# Rendered post-card cache: 'memory' (per worker), or 'sqlite'/'filesystem' to share it between workers
+app.config['FRAGMENT_CACHE_BACKEND'] = os.environ.get("FRAGMENT_CACHE_BACKEND", "memory")
+app.config['FRAGMENT_CACHE_MAX_ENTRIES'] = int(os.environ.get("FRAGMENT_CACHE_MAX_ENTRIES", 1000))
+if os.environ.get("FRAGMENT_CACHE_PATH"):
+    app.config['FRAGMENT_CACHE_PATH'] = os.environ["FRAGMENT_CACHE_PATH"]
+
+# Password hashing: bcrypt cost, the process pool that runs it off the request workers, and the
+# number of hashes in flight at once across all workers on the machine (beyond it logins get a 503)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 8))
+if os.environ.get("PASSWORD_HASH_SLOTS_PATH"):
+    app.config['PASSWORD_HASH_SLOTS_PATH'] = os.environ["PASSWORD_HASH_SLOTS_PATH"]
+
+# Resized WebP variants of uploads, built in a background process pool (needs Pillow)
+app.config['IMAGE_VARIANT_WORKERS'] = int(os.environ.get("IMAGE_VARIANT_WORKERS", 1))
+
+# Cached session-user projection used by flask_login on every request
+app.config['SESSION_USER_CACHE_SIZE'] = int(os.environ.get("SESSION_USER_CACHE_SIZE", 10000))
+app.config['SESSION_USER_CACHE_TTL'] = int(os.environ.get("SESSION_USER_CACHE_TTL", 60))
+
+# gzip/brotli compression of responses in the app itself (leave off behind a proxy that compresses)
+app.config['COMPRESS_RESPONSES'] = os.environ.get("COMPRESS_RESPONSES", "0") == "1"
+app.config['COMPRESS_GZIP_LEVEL'] = int(os.environ.get("COMPRESS_GZIP_LEVEL", 6))
+app.config['COMPRESS_BROTLI_LEVEL'] = int(os.environ.get("COMPRESS_BROTLI_LEVEL", 4))
+app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+
+# Stream the feed and post pages while they render, pulling posts/comments in chunks
+app.config['STREAM_PAGES'] = os.environ.get("STREAM_PAGES", "0") == "1"
+app.config['STREAM_CHUNK_SIZE'] = int(os.environ.get("STREAM_CHUNK_SIZE", 10))
+app.config['STREAM_BUFFER_SIZE'] = int(os.environ.get("STREAM_BUFFER_SIZE", 4096))
+
+# Per-request SQL/render metrics at /metrics, and a warning when one statement runs more than N times in a request (0 = off)
+app.config['METRICS_ENABLED'] = os.environ.get("METRICS_ENABLED", "0") == "1"
+app.config['METRICS_SQL'] = os.environ.get("METRICS_SQL", "1") == "1"
+app.config['METRICS_TEMPLATES'] = os.environ.get("METRICS_TEMPLATES", "1") == "1"
+app.config['N_PLUS_ONE_THRESHOLD'] = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 0))
+
+# Trending feed: weight of a comment against a like, hours for a tenfold drop in rank
+app.config['TRENDING_COMMENT_WEIGHT'] = float(os.environ.get("TRENDING_COMMENT_WEIGHT", 2))
+app.config['TRENDING_DECAY_HOURS'] = float(os.environ.get("TRENDING_DECAY_HOURS", 12))
+
 # ====================== EXTENSIONS ======================
 bcrypt = Bcrypt(app)
+password_hasher.init_app(app, bcrypt)
 login_manager = LoginManager(app)
 login_manager.login_view = "login_page"
 
 # Initialize database
+# The schema is managed by Flask-Migrate; run `flask --app main db upgrade` to
+# create or update it. Nothing here issues DDL, so workers boot without touching the schema.
 db.init_app(app)
-with app.app_context():
-    db.drop_all()
-    db.create_all()
+migrate = Migrate(app, db, include_object=exclude_search_index)
+fragment_cache.init_app(app)
+init_session_user_cache(app)
+image_variants.init_app(app)
+init_http_caching(app)
+assets.init_app(app)
+init_compression(app)
+instrumentation.init_app(app)
+init_trending(app)
+
 # ====================== LOGIN MANAGER ======================
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return load_session_user(int(user_id))
 
 # Import routes
 from routes.authentication import authentication_route
 from routes.profile_route import edit_profile
 from routes.home_routes import home_route
 from routes.make_post_routes import make_post_routes
+from routes.post_text import post_text_commands
+from routes.image_store import image_commands
+from routes.seed import seed_commands
+from routes.search import search_route, search_commands
+from routes.taxonomy import taxonomy_commands
 
 
 authentication_route(app)
 edit_profile(app)
 home_route(app)
 make_post_routes(app)
+post_text_commands(app)
+image_commands(app)
+asset_commands(app)
+seed_commands(app)
+search_route(app)
+search_commands(app)
+taxonomy_commands(app)
+trending_commands(app)
 
 # ---------------------- LANDING PAGE ----------------------
 @app.route('/landing_page')
@@ -114,13 +218,17 @@ def comment():
         flash("You must be logged in to comment.", "warning")
         return redirect(url_for('login_page'))
 
-    new_comment = Comment(user_id=current_user.id, blog_id=int(blog_id_str), content=content)
-    db.session.add(new_comment)
-    db.session.commit()
+    add_comment(int(blog_id_str), current_user.id, content)
 
     flash("Comment added successfully!", "success")
     return redirect(url_for('home_page'))
 
+# ---------------------- CACHE STATS ----------------------
+@app.route('/api/cache_stats')
+@login_required
+def cache_stats():
+    return jsonify(fragment_cache.stats())
+
 # ---------------------- SIGN OUT ----------------------
 @app.route('/sign_out')
 def sign_out():
@@ -129,34 +237,60 @@ def sign_out():
 
 @app.route('/post_detail/<int:post_id>', methods=['GET', "POST"])
 def post_detail(post_id):
-    blog = Post.query.get(post_id)
-    user = User.query.get(blog.user_id)
-    comments = Comment.query.filter_by(blog_id=post_id).all()
-    # Prepare comments data with user info
-    comments_data = []
-
-    for comment in comments:
-        comment_user = User.query.get(comment.user_id)
-        comments_data.append({
-            "content": comment.content,
-            "date": comment.date.strftime("%B %d, %Y"),
-            "fullname": User.query.get(comment.user_id).fullname,
-            "profile_image": User.query.get(comment.user_id).profile_image,
-        })
+    validators = post_validators(post_id)
+    if validators is None:
+        abort(404)
+    etag, last_modified = validators
+    if request.method == 'GET' and not_modified(etag, last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(render_post_detail(post_id))
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # The page is the same for every viewer, so shared caches may keep it too;
+    # everyone revalidates, which costs one query
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+def render_post_detail(post_id):
+    stream = streaming_enabled()
+    if stream:
+        # Comments are fetched in chunks while the page is being sent
+        blog = (Post.query.options(joinedload(Post.author), joinedload(Post.category))
+                .filter_by(id=post_id).first_or_404())
+        comments_data = (serialize_detail_comment(comment)
+                         for comment in iter_comments(post_id, app.config['STREAM_CHUNK_SIZE']))
+        comment_count = comment_counts([post_id]).get(post_id, 0)
+    else:
+        blog = (with_authors_and_comments(Post.query).options(joinedload(Post.category))
+                .filter_by(id=post_id).first_or_404())
+        comments_data = [serialize_detail_comment(comment) for comment in blog.comments]
+        comment_count = len(comments_data)
+    user = blog.author
 
     # Prepare blog data
     blogs_data = {
         "title": blog.title,
         "profile_image": user.profile_image,  # blog author image
         "featured_image": blog.image,
+        "image_variants": blog.image_variants,
+        "avatar_variants": user.avatar_variants,
         "fullname": user.fullname,
         "date": blog.date.strftime("%B %d, %Y"),
         "content": blog.content,
+        "excerpt": blog.excerpt,
+        "read_time": blog.read_time,
         "bio": user.bio,
+        "category": blog.category.name if blog.category else None,
+        "tags": [tag.name for tag in blog.tags],
         "comments": comments_data,
+        "comment_count": comment_count,
         "blog_id": post_id
     }
 
+    if stream:
+        return stream_page('post_detail.html', blog_data=blogs_data)
     return render_template('post_detail.html', blog_data=blogs_data)
 
 @app.route('/post_detail_comment', methods=['GET','POST'])
@@ -166,9 +300,7 @@ def post_detail_comment():
         if blog_id:
             user_id = current_user.id
             content = request.form.get('content')
-            new_comment = Comment(user_id=int(user_id), blog_id=int(blog_id), content=content)
-            db.session.add(new_comment)
-            db.session.commit()
+            add_comment(int(blog_id), int(user_id), content)
             return redirect(url_for('post_detail', post_id=blog_id))
     return render_template(url_for('home.html'))
 
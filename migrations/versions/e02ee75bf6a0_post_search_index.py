@@ -0,0 +1,63 @@
+"""post search index
+
+Indexes the existing posts, so they are searchable straight after upgrading.
+
+Revision ID: e02ee75bf6a0
+Revises: 3a6ebc02d7f0
+Create Date: 2026-10-18 19:51:15.965860
+
+"""
+from alembic import op
+from markupsafe import Markup
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e02ee75bf6a0'
+down_revision = '3a6ebc02d7f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE post_search ("
+            "post_id INTEGER PRIMARY KEY REFERENCES post (id) ON DELETE CASCADE, "
+            "title TEXT NOT NULL DEFAULT '', "
+            "body TEXT NOT NULL DEFAULT '', "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')) STORED)"
+        )
+        op.execute("CREATE INDEX ix_post_search_document ON post_search USING GIN (document)")
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE post_search USING fts5("
+            "title, body, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+
+    index_existing_posts()
+
+
+def index_existing_posts(batch_size=1000):
+    # The body is indexed as plain text, like routes.search.index_post does
+    bind = op.get_bind()
+    postgres = bind.dialect.name == 'postgresql'
+    post = sa.table('post', sa.column('id'), sa.column('title'), sa.column('content'))
+    insert = sa.text(f"INSERT INTO post_search ({'post_id' if postgres else 'rowid'}, title, body) "
+                     "VALUES (:id, :title, :body)")
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.select(post.c.id, post.c.title, post.c.content)
+                            .where(post.c.id > last_id).order_by(post.c.id).limit(batch_size)).all()
+        if not rows:
+            break
+        bind.execute(insert, [{'id': post_id, 'title': title or '', 'body': str(Markup(content or '').striptags())}
+                              for post_id, title, content in rows])
+        last_id = rows[-1].id
+    if not postgres:
+        bind.execute(sa.text("INSERT INTO post_search (post_search) VALUES ('optimize')"))
+
+
+def downgrade():
+    op.execute("DROP TABLE post_search")
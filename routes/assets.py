@@ -0,0 +1,242 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import click
+from flask import url_for, request, send_from_directory
+from routes.http_caching import IMMUTABLE
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it only .gz siblings are written
+    brotli = None
+
+# Built CSS/JS bundles.
+# Page styles and scripts live under assets/ and are concatenated, minified and
+# written to static/dist under a content-hashed name, with precompressed .gz
+# and .br siblings. A manifest maps each bundle name to its current file and
+# templates link to it through asset_url(), so the browser keeps every bundle
+# until a deploy changes its contents. The build runs in the release phase;
+# a worker that starts without a manifest builds one itself.
+
+logger = logging.getLogger(__name__)
+
+# bundle name -> source files under assets/
+BUNDLES = {
+    'base.css': ('css/base.css',),
+    'base.js': ('js/base.js',),
+    'home.css': ('css/home.css',),
+    'home.js': ('js/home.js',),
+    'make_post.css': ('css/make_post.css',),
+    'make_post.js': ('js/make_post.js',),
+    'profile.css': ('css/profile.css',),
+    'profile.js': ('js/profile.js',),
+}
+
+MANIFEST = 'manifest.json'
+# Accept-Encoding token -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_CSS_TOKEN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.S)
+# A "/" after one of these starts a regex literal rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def minify_css(source):
+    # Strings are set aside while whitespace is squeezed, comments are dropped
+    strings = []
+
+    def set_aside(match):
+        if match.group().startswith('/*'):
+            return ''
+        strings.append(match.group())
+        return f"\0{len(strings) - 1}\0"
+
+    text = _CSS_TOKEN.sub(set_aside, source)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r' ?([{};,>]) ?', r'\1', text)
+    # Only after a colon: "a :hover" and "a:hover" are different selectors
+    text = text.replace(': ', ':').replace(';}', '}').strip()
+    return re.sub(r'\0(\d+)\0', lambda m: strings[int(m.group(1))], text)
+
+
+def minify_js(source):
+    """Drop comments and indentation.
+
+    Line breaks are kept so automatic semicolon insertion sees the same code,
+    and string, template and regex literals are copied unchanged.
+    """
+    pieces = []  # (is_code, text)
+    i, n = 0, len(source)
+    last = ''
+    while i < n:
+        c = source[i]
+        if c in '"\'`':
+            j = i + 1
+            while j < n and source[j] != c:
+                j += 2 if source[j] == '\\' else 1
+            pieces.append((False, source[i:j + 1]))
+            last = c
+            i = j + 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            pieces.append((True, ' '))
+            i = n if end == -1 else end + 2
+        elif c == '/' and (not last or last in _REGEX_PRECEDERS):
+            j = i + 1
+            in_class = False
+            while j < n and source[j] != '\n':
+                if source[j] == '\\':
+                    j += 2
+                    continue
+                if source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                elif source[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and source[j].isalnum():
+                j += 1
+            pieces.append((False, source[i:j]))
+            last = '/'
+            i = j
+        else:
+            pieces.append((True, c))
+            if not c.isspace():
+                last = c
+            i += 1
+
+    out = []
+    code = []
+    for is_code, text in pieces + [(False, '')]:
+        if is_code:
+            code.append(text)
+            continue
+        if code:
+            out.append(_squeeze_js(''.join(code)))
+            code = []
+        out.append(text)
+    return ''.join(out).strip() + '\n'
+
+
+def _squeeze_js(text):
+    text = re.sub(r'[ \t]+', ' ', text)
+    return re.sub(r' ?\n\s*', '\n', text)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def build_bundles(source_dir, output_dir, bundles=BUNDLES):
+    """Write every bundle and its compressed siblings, then the manifest. Returns the manifest."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {}
+    for name, sources in bundles.items():
+        stem, ext = os.path.splitext(name)
+        parts = []
+        for source in sources:
+            with open(os.path.join(source_dir, source), encoding='utf-8') as f:
+                parts.append(MINIFIERS[ext](f.read()))
+        content = '\n'.join(parts).encode('utf-8')
+        filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        target = os.path.join(output_dir, filename)
+        if not os.path.exists(target):
+            _write(target, content)
+            _write(f"{target}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(f"{target}.br", brotli.compress(content, quality=11))
+        manifest[name] = filename
+    _write(os.path.join(output_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def _write(path, data):
+    # Write then rename so a worker serving the directory never sees a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class Assets:
+    def __init__(self):
+        self.app = None
+        self.manifest = {}
+        self.encoded = {}
+
+    def init_app(self, app):
+        app.config.setdefault('ASSETS_SOURCE', os.path.join(app.root_path, 'assets'))
+        app.config.setdefault('ASSETS_OUTPUT', os.path.join(app.static_folder, 'dist'))
+        self.app = app
+        app.jinja_env.globals['asset_url'] = asset_url
+        # More specific than /static/<path:filename>, so it takes over the dist directory
+        app.add_url_rule('/static/dist/<path:filename>', 'asset', self.serve)
+        self.load()
+
+    @property
+    def output(self):
+        return self.app.config['ASSETS_OUTPUT']
+
+    def load(self):
+        try:
+            with open(os.path.join(self.output, MANIFEST), encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            logger.info("No asset manifest in %s, building bundles", self.output)
+            self.manifest = self.build()
+        self.encoded = {
+            filename: [(token, suffix) for token, suffix in ENCODINGS
+                       if os.path.exists(os.path.join(self.output, filename + suffix))]
+            for filename in self.manifest.values()
+        }
+
+    def build(self):
+        return build_bundles(self.app.config['ASSETS_SOURCE'], self.output)
+
+    def serve(self, filename):
+        for token, suffix in self.encoded.get(filename, ()):
+            if request.accept_encodings[token]:
+                response = send_from_directory(self.output, filename + suffix,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.content_encoding = token
+                break
+        else:
+            response = send_from_directory(self.output, filename)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.expires = None
+        return response
+
+
+assets = Assets()
+
+
+def asset_url(name):
+    return url_for('asset', filename=assets.manifest[name])
+
+
+def asset_commands(app):
+    @app.cli.group('assets')
+    def assets_group():
+        """Build the CSS/JS bundles."""
+
+    @assets_group.command('build')
+    def build():
+        """Minify the bundles, write their .gz/.br siblings and the manifest."""
+        manifest = assets.build()
+        for name, filename in sorted(manifest.items()):
+            path = os.path.join(assets.output, filename)
+            sizes = [f"{os.path.getsize(path)} B"]
+            sizes += [f"{os.path.getsize(path + suffix)} B{suffix}" for _, suffix in ENCODINGS
+                      if os.path.exists(path + suffix)]
+            click.echo(f"{name:16} {filename:32} {', '.join(sizes)}")
+        if brotli is None:
+            click.echo("brotli is not installed; no .br files were written.")
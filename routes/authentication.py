@@ -1,10 +1,17 @@
+import logging
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_user, current_user
 from routes.models_routes import User, db
-from datetime import date
-from flask_bcrypt import Bcrypt, check_password_hash
+from routes.password_hashing import password_hasher, HashingBusy
 
-bcrypt = Bcrypt()
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGE = "We're handling a lot of sign-ins right now. Please try again in a moment."
+
+
+def busy_response(template):
+    flash(BUSY_MESSAGE)
+    return render_template(template), 503, {'Retry-After': '5'}
 
 
 def authentication_route(app):
@@ -13,12 +20,14 @@ def authentication_route(app):
         if current_user.is_authenticated:
             return redirect(url_for('home_page'))
         if request.method == 'POST':
-            print("✅ SIGNUP POST REQUEST RECEIVED")  # Debug
-            print(f"Form data: {request.form}")
+            logger.debug("Signup request for %s", request.form.get('email'))
             fullname = request.form['fullname']
             email = request.form['email']
             password = request.form['password']
-            hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+            try:
+                hashed_password = password_hasher.hash_password(password)
+            except HashingBusy:
+                return busy_response('signup.html')
             new_user = User(
                 fullname=fullname,
                 email=email,
@@ -27,7 +36,7 @@ def authentication_route(app):
             db.session.add(new_user)
             db.session.commit()
 
-            print("user added sucessfully")
+            logger.info("User %s signed up", new_user.id)
 
             return redirect(url_for('login_page'))
         return render_template('signup.html')
@@ -44,7 +53,18 @@ def authentication_route(app):
             if not user:
                 flash("No account found with that email")
                 return render_template('login.html')
-            if check_password_hash(user.password, password):
+            try:
+                password_ok = password_hasher.check_password(user.password, password)
+            except HashingBusy:
+                return busy_response('login.html')
+            if password_ok:
+                # Upgrade hashes made with an older BCRYPT_LOG_ROUNDS while we have the plaintext
+                if password_hasher.needs_rehash(user.password):
+                    try:
+                        user.password = password_hasher.hash_password(password)
+                        db.session.commit()
+                    except HashingBusy:
+                        pass
                 login_user(user)
                 return redirect(url_for('home_page'))
             else:
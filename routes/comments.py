@@ -0,0 +1,18 @@
+from datetime import datetime
+from routes.models_routes import Comment, db
+from routes.fragment_cache import fragment_cache
+from routes.trending import record_engagement
+
+# Comment writes.
+# Every route that adds a comment goes through add_comment, so the cached
+# cards showing the post's comment count are dropped, and the post's trending
+# score is raised in the same transaction as the insert, in one place.
+
+
+def add_comment(post_id, user_id, content, date=None):
+    comment = Comment(user_id=user_id, blog_id=post_id, content=content, date=date or datetime.utcnow())
+    db.session.add(comment)
+    record_engagement(post_id, comments=1)
+    db.session.commit()
+    fragment_cache.invalidate_posts([post_id])
+    return comment
@@ -0,0 +1,168 @@
+import zlib
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it only gzip is offered
+    brotli = None
+
+# Response compression for dynamic pages.
+# A WSGI middleware that compresses response bodies as they are produced:
+# each chunk the app yields is compressed and flushed straight away, so a
+# streamed page still reaches the client piece by piece. Responses that are
+# small, already encoded (the precompressed asset bundles) or not text (images)
+# pass through untouched. It is off unless COMPRESS_RESPONSES is set, since a
+# proxy in front of gunicorn may already do this.
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                      'image/svg+xml')
+
+
+class GzipEncoder:
+    def __init__(self, level):
+        # wbits=31 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, wsgi_app, gzip_level=6, brotli_level=4, min_size=1024):
+        self.wsgi_app = wsgi_app
+        self.min_size = min_size
+        # Preferred first when the client accepts both equally
+        self.encoders = []
+        if brotli is not None:
+            self.encoders.append(('br', lambda: BrotliEncoder(brotli_level)))
+        self.encoders.append(('gzip', lambda: GzipEncoder(gzip_level)))
+
+    def choose_encoding(self, accept_encoding):
+        accepted = parse_accept_header(accept_encoding)
+        best = None
+        for token, factory in self.encoders:
+            quality = accepted[token]
+            if quality and (best is None or quality > best[0]):
+                best = (quality, token, factory)
+        return best[1:] if best else (None, None)
+
+    def __call__(self, environ, start_response):
+        token, factory = self.choose_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if token is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.wsgi_app(environ, start_response)
+
+        response = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = status
+            response['headers'] = headers
+            response['exc_info'] = exc_info
+            # Flask and werkzeug never use the legacy write() callable
+            return None
+
+        app_iter = self.wsgi_app(environ, capture_start_response)
+        return self._respond(app_iter, response, start_response, token, factory)
+
+    def compressible(self, status, headers):
+        status_code = int(status.split(' ', 1)[0])
+        if status_code < 200 or status_code in (204, 206, 304):
+            return False
+        values = {name.lower(): value for name, value in headers}
+        if 'content-encoding' in values or 'no-transform' in values.get('cache-control', ''):
+            return False
+        if not values.get('content-type', '').startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = values.get('content-length')
+        return length is None or int(length) >= self.min_size
+
+    def _respond(self, app_iter, response, start_response, token, factory):
+        try:
+            chunks = iter(app_iter)
+            # Hold back the start of the body until it is clear whether it
+            # reaches min_size; a short body is sent as it is.
+            buffered = []
+            size = 0
+            finished = False
+            while size < self.min_size:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    finished = True
+                    break
+                buffered.append(chunk)
+                size += len(chunk)
+
+            status, headers = response['status'], response['headers']
+            if (finished and size < self.min_size) or not self.compressible(status, headers):
+                start_response(status, headers, response['exc_info'])
+                response['started'] = True
+                yield from buffered
+                if not finished:
+                    yield from chunks
+                return
+
+            start_response(status, encoded_headers(headers, token), response['exc_info'])
+            response['started'] = True
+            encoder = factory()
+            body = encoder.compress(b''.join(buffered))
+            if body:
+                yield body
+            if not finished:
+                for chunk in chunks:
+                    if chunk:
+                        yield encoder.compress(chunk)
+            yield encoder.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+
+def encoded_headers(headers, token):
+    result = []
+    vary = None
+    for name, value in headers:
+        lower = name.lower()
+        if lower == 'content-length':
+            continue
+        if lower == 'etag' and not value.startswith('W/'):
+            # The encoded body is a different representation of the same resource
+            value = f"W/{value}"
+        if lower == 'vary':
+            vary = value
+            continue
+        result.append((name, value))
+    if vary is None:
+        vary = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        vary = f"{vary}, Accept-Encoding"
+    result.append(('Vary', vary))
+    result.append(('Content-Encoding', token))
+    return result
+
+
+def init_compression(app):
+    app.config.setdefault('COMPRESS_RESPONSES', False)
+    app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BROTLI_LEVEL', 4)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+    if app.config['COMPRESS_RESPONSES']:
+        app.wsgi_app = CompressionMiddleware(app.wsgi_app,
+                                             gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+                                             brotli_level=app.config['COMPRESS_BROTLI_LEVEL'],
+                                             min_size=app.config['COMPRESS_MIN_SIZE'])
@@ -0,0 +1,59 @@
+import sqlalchemy as sa
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+# Engine options and read-replica routing.
+# engine_options turns the DATABASE_* settings into create_engine() keyword
+# arguments for a URL: pre-ping and recycle for every engine, pool sizing and
+# a statement timeout only where the driver has them (SQLite files keep
+# SQLAlchemy's own pool and have no statement timeout).
+#
+# With DATABASE_REPLICA_URL set the replica is the REPLICA_BIND engine and
+# RoutingSession sends the reads of GET requests to READ_REPLICA_ENDPOINTS
+# there. Flushes and INSERT/UPDATE/DELETE statements always go to the primary,
+# and once a request has written, its later reads do too so it sees its own
+# writes. Replication lag is still visible across requests: a page served
+# from the replica may not show a post created a moment earlier.
+
+REPLICA_BIND = 'replica'
+
+
+def database_url(url):
+    """Normalize a Heroku-style postgres:// URL for SQLAlchemy."""
+    if url and url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+psycopg2://", 1)
+    return url
+
+
+def engine_options(url, config):
+    options = {
+        'pool_pre_ping': config['DATABASE_POOL_PRE_PING'],
+        'pool_recycle': config['DATABASE_POOL_RECYCLE'],
+    }
+    backend = sa.engine.make_url(url).get_backend_name()
+    if backend != 'sqlite':
+        options.update(pool_size=config['DATABASE_POOL_SIZE'],
+                       max_overflow=config['DATABASE_MAX_OVERFLOW'],
+                       pool_timeout=config['DATABASE_POOL_TIMEOUT'])
+    timeout = config['DATABASE_STATEMENT_TIMEOUT']
+    if timeout and backend == 'postgresql':
+        options['connect_args'] = {'options': f"-c statement_timeout={timeout}"}
+    return options
+
+
+def replica_request():
+    return (has_request_context()
+            and request.method in ('GET', 'HEAD')
+            and request.endpoint in current_app.config['READ_REPLICA_ENDPOINTS'])
+
+
+class RoutingSession(Session):
+    """db.session: reads of read-only requests go to the replica bind, everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and REPLICA_BIND in self._db.engines:
+            if self._flushing or isinstance(clause, sa.UpdateBase):
+                self.info['wrote'] = True
+            elif not self.info.get('wrote') and replica_request():
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,271 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import joinedload, selectinload, defer, load_only
+from routes.models_routes import User, Post, Comment, Tag, PostTag, Category, PostScore, db
+from routes.image_store import registered_images
+
+# Keyset pagination for the home feed.
+# The feed is ordered by (date DESC, id DESC); a cursor is the (date, id) of the
+# last post on the previous page, so every page is a bounded index range read
+# no matter how deep the reader scrolls. Comment threads use the same cursors,
+# ordered oldest first. A feed filtered by tag pages over post_tag's copy of
+# the date instead, so it is a range of that table's (tag_id, date, post_id) index.
+# The trending feed pages over (score, post_id) DESC of post_score the same way.
+
+
+def encode_cursor(row):
+    raw = f"{row.date.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (date, id) for a cursor string, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        date_str, post_id = raw.split('|', 1)
+        return datetime.fromisoformat(date_str), int(post_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def encode_score_cursor(score, post_id):
+    raw = f"{score!r}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_score_cursor(cursor):
+    """Return (score, post_id) for a trending cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        score, post_id = raw.split('|', 1)
+        return float(score), int(post_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def page_size(app, requested=None, setting='FEED_PAGE_SIZE'):
+    default = app.config[setting]
+    maximum = app.config['FEED_MAX_PAGE_SIZE']
+    try:
+        size = int(requested) if requested else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def with_authors_and_comments(query):
+    """Eager-load post authors, comments and comment authors.
+
+    A page of posts then costs three queries in total (posts joined to their
+    authors, one IN query for the comments, one IN query for the comment
+    authors) however many posts or comments the page holds.
+    """
+    return query.options(
+        joinedload(Post.author),
+        selectinload(Post.comments).selectinload(Comment.author),
+    )
+
+
+def newest_first_page(query, limit, cursor=None, date_column=Post.date, id_column=Post.id):
+    """Apply the (date, id) DESC keyset to a Post query and return (posts, next_cursor)."""
+    position = decode_cursor(cursor)
+    if position:
+        last_date, last_id = position
+        query = query.filter(or_(
+            date_column < last_date,
+            and_(date_column == last_date, id_column < last_id),
+        ))
+
+    # Fetch one extra row to know whether another page exists without a COUNT
+    posts = query.order_by(date_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1])
+    return posts, next_cursor
+
+
+def trending_page(query, limit, cursor=None):
+    """Order a Post query by hot score, highest first, and return (posts, next_cursor)."""
+    query = query.join(PostScore, PostScore.post_id == Post.id).add_columns(PostScore.score)
+    position = decode_score_cursor(cursor)
+    if position:
+        last_score, last_id = position
+        query = query.filter(or_(
+            PostScore.score < last_score,
+            and_(PostScore.score == last_score, PostScore.post_id < last_id),
+        ))
+
+    rows = query.order_by(PostScore.score.desc(), PostScore.post_id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_score_cursor(rows[-1].score, rows[-1].Post.id)
+    return [row.Post for row in rows], next_cursor
+
+
+def fetch_feed_page(limit, cursor=None, tag=None, category=None, sort=None):
+    """Return (posts, next_cursor) for one page of the feed, newest first.
+
+    Comments are not loaded here; the feed only shows a count per post and the
+    comment modal fetches the thread on demand (see fetch_comments_page). The
+    body is deferred too: cards use the excerpt and read time stored at write time.
+    ``tag`` (a tag name) and ``category`` (a category slug) narrow the feed;
+    ``sort='trending'`` orders it by hot score instead of date.
+    """
+    query = Post.query.options(joinedload(Post.author).load_only(User.id, User.fullname, User.profile_image,
+                                                                 User.avatar_variants),
+                               defer(Post.content))
+    if category:
+        query = query.join(Category, Category.id == Post.category_id).filter(Category.slug == category)
+    if tag:
+        query = (query.join(PostTag, PostTag.post_id == Post.id)
+                 .join(Tag, Tag.id == PostTag.tag_id)
+                 .filter(Tag.name == tag))
+    if sort == 'trending':
+        return trending_page(query, limit, cursor)
+    if tag:
+        return newest_first_page(query, limit, cursor, PostTag.date, PostTag.post_id)
+    return newest_first_page(query, limit, cursor)
+
+
+def fetch_user_posts_page(user_id, limit, cursor=None):
+    """Return (posts, next_cursor) for one author's posts, loading only the card columns."""
+    query = (Post.query
+             .options(load_only(Post.id, Post.title, Post.date, Post.read_time, Post.excerpt))
+             .filter(Post.user_id == user_id))
+    return newest_first_page(query, limit, cursor)
+
+
+def count_user_posts(user_id):
+    return db.session.query(func.count(Post.id)).filter(Post.user_id == user_id).scalar()
+
+
+def fetch_comments_page(post_id, limit, cursor=None):
+    """Return (comments, next_cursor) for one page of a post's comments, oldest first."""
+    query = Comment.query.options(joinedload(Comment.author)).filter_by(blog_id=post_id)
+    position = decode_cursor(cursor)
+    if position:
+        last_date, last_id = position
+        query = query.filter(or_(
+            Comment.date > last_date,
+            and_(Comment.date == last_date, Comment.id > last_id),
+        ))
+
+    comments = query.order_by(Comment.date, Comment.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(comments[-1])
+    return comments, next_cursor
+
+
+def comment_counts(post_ids):
+    """Return {post_id: comment count} for the given posts in a single GROUP BY query."""
+    if not post_ids:
+        return {}
+    rows = (db.session.query(Comment.blog_id, func.count(Comment.id))
+            .filter(Comment.blog_id.in_(post_ids))
+            .group_by(Comment.blog_id)
+            .all())
+    return dict(rows)
+
+
+def serialize_comment(c):
+    comment_user = c.author
+    return {
+        "content": c.content,
+        "date": c.date.strftime('%b %d, %Y'),
+        "user_name": comment_user.fullname if comment_user else "Unknown User",
+        "user_profile_image": comment_user.profile_image if comment_user else None,
+        "user_avatar_variants": comment_user.avatar_variants if comment_user else None,
+    }
+
+
+def serialize_detail_comment(c):
+    """A comment as the post detail page shows it."""
+    comment_user = c.author
+    return {
+        "content": c.content,
+        "date": c.date.strftime("%B %d, %Y"),
+        "fullname": comment_user.fullname,
+        "profile_image": comment_user.profile_image,
+        "avatar_variants": comment_user.avatar_variants,
+    }
+
+
+def build_feed_items(blogs):
+    counts = comment_counts([blog.id for blog in blogs])
+    images = registered_images(blog.image for blog in blogs)
+    posts = []
+    for blog in blogs:
+        user = blog.author
+        user_name = user.fullname if user else "Unknown User"
+        user_profile_image = user.profile_image if user else None
+        user_avatar_variants = user.avatar_variants if user else None
+
+        blog_image = blog.image if blog.image in images else None
+
+        posts.append({
+            "title": blog.title,
+            "excerpt": blog.excerpt,
+            "read_time": blog.read_time,
+            "image": blog_image,
+            "image_variants": blog.image_variants if blog_image else None,
+            "name": user_name,
+            "profile_image": user_profile_image,
+            "avatar_variants": user_avatar_variants,
+            "date": blog.date,
+            "id": blog.id,
+            "comment_count": counts.get(blog.id, 0)
+        })
+    return posts
+
+
+class FeedStream:
+    """One page of the feed, fetched ``chunk_size`` posts at a time as it is iterated.
+
+    Every chunk is its own keyset query, so only one chunk of posts is held at
+    a time. Iterating yields ``render(item)`` for each feed item; ``count`` and
+    ``next_cursor`` are complete once iteration has finished.
+    """
+
+    def __init__(self, limit, cursor=None, chunk_size=None, render=None, tag=None, category=None, sort=None):
+        self.limit = limit
+        self.cursor = cursor
+        self.tag = tag
+        self.category = category
+        self.sort = sort
+        self.chunk_size = chunk_size or limit
+        self.render = render or (lambda item: item)
+        self.count = 0
+        self.next_cursor = None
+
+    def __iter__(self):
+        remaining = self.limit
+        cursor = self.cursor
+        while remaining > 0:
+            blogs, cursor = fetch_feed_page(min(self.chunk_size, remaining), cursor, self.tag, self.category,
+                                            self.sort)
+            remaining -= len(blogs)
+            for item in build_feed_items(blogs):
+                self.count += 1
+                yield self.render(item)
+            if cursor is None:
+                break
+        self.next_cursor = cursor
+
+
+def iter_comments(post_id, chunk_size):
+    """Yield a post's comments oldest first, fetching ``chunk_size`` at a time."""
+    cursor = None
+    while True:
+        comments, cursor = fetch_comments_page(post_id, chunk_size, cursor)
+        yield from comments
+        if cursor is None:
+            return
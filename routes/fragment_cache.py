@@ -0,0 +1,272 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from markupsafe import Markup
+from routes.models_routes import Post, db
+
+# Cache for rendered HTML fragments (post cards on the feed and profile pages).
+# Entries are keyed by post id and dropped by the write paths that change what a
+# card shows: new comments, new posts and profile edits (author name and avatar).
+# Each entry also carries a fingerprint of the data it was rendered from, so a
+# worker whose in-process LRU missed an invalidation made in another worker
+# still re-renders instead of serving a stale card.
+
+# Templates whose output is cached; their hash prefixes every key
+CARD_TEMPLATES = ('post_card.html', 'profile_post_card.html')
+
+
+class MemoryBackend:
+    """Per-process LRU bounded by entry count."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteBackend:
+    """Shared across gunicorn workers through a local SQLite file.
+
+    Hits are read-only: recency is noted in memory and written with the next
+    insert, which is also the only time entries are evicted.
+    """
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._touched = {}
+        self._touched_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS fragment "
+                     "(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_fragment_used ON fragment (used)")
+
+    def _conn(self):
+        # One connection per thread, reopened after a fork (a connection must not cross processes)
+        conn, pid = getattr(self._local, 'conn', None), getattr(self._local, 'pid', None)
+        if conn is None or pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            # WAL stays consistent without an fsync per commit; a crash can only lose recent cache entries
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value FROM fragment WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self._touched_lock:
+            self._touched[key] = time.time()
+        return row[0]
+
+    def set(self, key, value):
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if touched:
+                conn.executemany("UPDATE fragment SET used = ? WHERE key = ?",
+                                 [(used, touched_key) for touched_key, used in touched.items()])
+            conn.execute("INSERT OR REPLACE INTO fragment (key, value, used) VALUES (?, ?, ?)",
+                         (key, value, time.time()))
+            conn.execute("DELETE FROM fragment WHERE key IN (SELECT key FROM fragment "
+                         "ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_many(self, keys):
+        self._conn().executemany("DELETE FROM fragment WHERE key = ?", [(key,) for key in keys])
+
+    def clear(self):
+        self._conn().execute("DELETE FROM fragment")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM fragment").fetchone()[0]
+
+
+class FileSystemBackend:
+    """Shared across gunicorn workers as one file per entry in a directory."""
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._writes = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.html')
+
+    def get(self, key):
+        try:
+            with open(self._file(key), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        # Write then rename so readers in other workers never see a partial file
+        target = self._file(key)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(value)
+        os.replace(tmp, target)
+        # Counting the directory is a full scan, so it only happens every PRUNE_EVERY writes per
+        # process; until then the cache can run that many entries per worker over max_entries
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+
+    def _prune(self):
+        entries = [e for e in os.scandir(self.path) if e.name.endswith('.html')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def delete_many(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.html'):
+                os.remove(entry.path)
+
+    def __len__(self):
+        return sum(1 for e in os.scandir(self.path) if e.name.endswith('.html'))
+
+
+class FragmentCache:
+    def __init__(self):
+        self.backend = MemoryBackend(1000)
+        self.enabled = True
+        self.prefix = ''
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('FRAGMENT_CACHE_ENABLED', True)
+        app.config.setdefault('FRAGMENT_CACHE_BACKEND', 'memory')
+        app.config.setdefault('FRAGMENT_CACHE_PATH', os.path.join(app.instance_path, 'fragment_cache'))
+        app.config.setdefault('FRAGMENT_CACHE_MAX_ENTRIES', 1000)
+        # A deploy that changes a card template starts on fresh keys, so a shared
+        # cache does not keep serving markup from the previous one
+        templates = hashlib.sha256()
+        for name in CARD_TEMPLATES:
+            with open(os.path.join(app.root_path, app.template_folder, name), 'rb') as f:
+                templates.update(f.read())
+        app.config.setdefault('FRAGMENT_CACHE_PREFIX', templates.hexdigest()[:12])
+
+        self.enabled = app.config['FRAGMENT_CACHE_ENABLED']
+        self.prefix = app.config['FRAGMENT_CACHE_PREFIX']
+        backend = app.config['FRAGMENT_CACHE_BACKEND']
+        max_entries = app.config['FRAGMENT_CACHE_MAX_ENTRIES']
+        if backend == 'sqlite':
+            self.backend = SqliteBackend(app.config['FRAGMENT_CACHE_PATH'] + '.sqlite', max_entries)
+        elif backend == 'filesystem':
+            self.backend = FileSystemBackend(app.config['FRAGMENT_CACHE_PATH'], max_entries)
+        elif backend == 'memory':
+            self.backend = MemoryBackend(max_entries)
+        else:
+            raise ValueError(f"Unknown FRAGMENT_CACHE_BACKEND: {backend!r}")
+        app.extensions['fragment_cache'] = self
+
+    def _key(self, kind, post_id):
+        return f"{self.prefix}:{kind}:{post_id}"
+
+    def get_or_render(self, kind, post_id, data, render):
+        """Return the cached fragment for (kind, post_id), rendering and storing it on a miss.
+
+        ``data`` is whatever the fragment is rendered from; a cached entry built
+        from different data counts as a miss.
+        """
+        if not self.enabled:
+            return Markup(render())
+        key = self._key(kind, post_id)
+        fingerprint = hashlib.sha1(repr(data).encode('utf-8')).hexdigest()
+        html = None
+        cached = self.backend.get(key)
+        if cached is not None:
+            cached_fingerprint, _, cached_html = cached.partition('\n')
+            if cached_fingerprint == fingerprint:
+                html = cached_html
+        with self._lock:
+            if html is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if html is None:
+            html = render()
+            self.backend.set(key, f"{fingerprint}\n{html}")
+        return Markup(html)
+
+    def invalidate_posts(self, post_ids):
+        keys = [self._key(kind, post_id) for post_id in post_ids for kind in ('post_card', 'profile_card')]
+        if keys:
+            self.backend.delete_many(keys)
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else 0.0,
+        }
+
+
+fragment_cache = FragmentCache()
+
+
+def invalidate_author_cards(user_id):
+    """Drop every cached card written by user_id (their name and avatar are on each one)."""
+    post_ids = [row[0] for row in db.session.query(Post.id).filter(Post.user_id == user_id)]
+    fragment_cache.invalidate_posts(post_ids)
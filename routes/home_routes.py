@@ -1,10 +1,31 @@
-import os
-from flask import render_template, redirect, url_for
-from flask_login import current_user
-from datetime import date
-from routes.models_routes import User, Post, Comment, db
+from flask import render_template, redirect, url_for, request, jsonify
+from flask_login import current_user, login_required
+from datetime import date, datetime
+from types import SimpleNamespace
+from routes.models_routes import User, Post, db
+from routes.session_users import invalidate_session_user
+from routes.fragment_cache import fragment_cache
+from routes.feed import (fetch_feed_page, fetch_comments_page, build_feed_items, serialize_comment, page_size,
+                         FeedStream, comment_counts, serialize_detail_comment)
+from routes.comments import add_comment
+from routes.streaming import streaming_enabled, stream_page
+from routes.taxonomy import tag_cloud
 
 def home_route(app):
+    def render_post_card(blog):
+        return fragment_cache.get_or_render('post_card', blog['id'], blog,
+                                            lambda: render_template('post_card.html', blog=blog))
+
+    def render_post_cards(posts):
+        return [render_post_card(blog) for blog in posts]
+
+    def feed_filter():
+        # ?tag=<name>, ?category=<slug> and ?sort=trending; passed on to /api/feed by the infinite scroll
+        filters = {key: request.args[key] for key in ('tag', 'category') if request.args.get(key)}
+        if request.args.get('sort') == 'trending':
+            filters['sort'] = 'trending'
+        return filters
+
     @app.route('/', methods=['GET', 'POST'])
     def home_page():
         if not current_user.is_authenticated:
@@ -17,45 +38,79 @@ def home_route(app):
             "user_name": current_user.user_name,
         }
 
-        blogs = Post.query.order_by(Post.date.desc()).all()
-        posts = []
-
-        for blog in blogs:
-            user = User.query.filter_by(id=blog.user_id).first()
-            user_name = user.fullname if user else "Unknown User"
-            user_profile_image = user.profile_image if user else None
-
-            comments_section = Comment.query.filter_by(blog_id=blog.id).all()
-            comments_list = []
-            for c in comments_section:
-                comment_user = User.query.get(c.user_id)
-                comments_list.append({
-                    "content": c.content,
-                    "date": c.date.strftime('%b %d, %Y'),
-                    "user_name": comment_user.fullname if comment_user else "Unknown User",
-                    "user_profile_image": comment_user.profile_image if comment_user else None
-                })
-
-            blog_image = None
-            if blog.image:
-                image_path = os.path.join(app.config['FEATURED_IMAGE_FOLDER'], blog.image)
-                if os.path.exists(image_path):
-                    blog_image = blog.image
-
-            posts.append({
-                "title": blog.title,
-                "content": blog.content,
-                "image": blog_image,
-                "name": user_name,
-                "profile_image": user_profile_image,
-                "date": blog.date,
-                "id": blog.id,
-                "Comments": comments_list
-            })
-
         # Add joined date for first-time users
         if not current_user.joined:
-            current_user.joined = str(date.today())
+            User.query.filter_by(id=current_user.id).update({'joined': str(date.today())})
             db.session.commit()
+            invalidate_session_user(current_user.id)
+
+        filters = feed_filter()
+        if streaming_enabled():
+            # The cards are queried and rendered while the page is being sent
+            feed = FeedStream(page_size(app), chunk_size=app.config['STREAM_CHUNK_SIZE'], render=render_post_card,
+                              **filters)
+            return stream_page('home.html', user_info=user_info, feed=feed, cards=feed, feed_filter=filters)
+
+        feed = FeedStream(page_size(app), render=render_post_card, **filters)
+        cards = list(feed)
+        return render_template('home.html', user_info=user_info, feed=feed, cards=cards, feed_filter=filters)
+
+    # ---------------------- INFINITE SCROLL ----------------------
+    @app.route('/api/feed')
+    @login_required
+    def feed_api():
+        blogs, next_cursor = fetch_feed_page(
+            page_size(app, request.args.get('limit')),
+            request.args.get('cursor'),
+            **feed_filter(),
+        )
+        posts = build_feed_items(blogs)
+        html = ''.join(render_post_cards(posts))
+        return jsonify({'html': html, 'count': len(posts), 'next_cursor': next_cursor})
+
+    # ---------------------- TAG CLOUD ----------------------
+    @app.route('/api/tags')
+    @login_required
+    def tags_api():
+        tags = tag_cloud(page_size(app, request.args.get('limit'), 'TAG_CLOUD_SIZE'))
+        return jsonify({'tags': [{'name': name, 'count': count, 'url': url_for('home_page', tag=name)}
+                                 for name, count in tags]})
+
+    # ---------------------- POST COMMENTS ----------------------
+    @app.route('/api/posts/<int:post_id>/comments')
+    @login_required
+    def post_comments_api(post_id):
+        comments, next_cursor = fetch_comments_page(
+            post_id,
+            page_size(app, request.args.get('limit'), 'COMMENTS_PAGE_SIZE'),
+            request.args.get('cursor'),
+        )
+        items = [serialize_comment(c) for c in comments]
+        html = ''.join(render_template('comment_item.html', comment=comment) for comment in items)
+        return jsonify({'html': html, 'count': len(items), 'next_cursor': next_cursor})
+
+    @app.route('/api/posts/<int:post_id>/comments', methods=['POST'])
+    @login_required
+    def add_comment_api(post_id):
+        """Add a comment and return it rendered, with the post's new comment count.
+
+        ?view=detail renders it for the post page instead of the feed modal.
+        """
+        content = (request.form.get('content') or '').strip()
+        if not content:
+            return jsonify({'error': 'Comment cannot be empty.'}), 400
+        if db.session.query(Post.id).filter_by(id=post_id).scalar() is None:
+            return jsonify({'error': 'Post not found.'}), 404
+
+        now = datetime.utcnow()
+        add_comment(post_id, current_user.id, content, now)
+        # Rendered from what is already known (the author is the session user)
+        # rather than reloading the committed row
+        comment = SimpleNamespace(content=content, date=now, author=current_user)
+        if request.args.get('view') == 'detail':
+            html = render_template('post_detail_comment.html', comment=serialize_detail_comment(comment))
+        else:
+            html = render_template('comment_item.html', comment=serialize_comment(comment))
+        count = comment_counts([post_id]).get(post_id, 0)
+        return jsonify({'html': html, 'count': count}), 201
 
-        return render_template('home.html', user_info=user_info, blogs=posts)
\ No newline at end of file
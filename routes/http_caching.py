@@ -0,0 +1,124 @@
+import hashlib
+import os
+from flask import request, current_app
+from flask.sessions import SecureCookieSessionInterface
+from sqlalchemy import select, func, true
+from sqlalchemy.orm import aliased
+from routes.models_routes import User, Post, Comment, db
+
+# HTTP caching.
+# Static files get far-future immutable caching. Uploaded images are already
+# fingerprinted by their names (featured images are stored under their content
+# hash, profile pictures get a new name per upload, variants derive from
+# either), so they are marked immutable as they are. Every other static file
+# gets a ?v=<content hash> parameter from url_for so a deploy that changes it
+# also changes its URL.
+#
+# Post pages carry an ETag and Last-Modified built from one small query over
+# the post, its author and its comments, so a repeat reader gets a 304 without
+# the page being rendered. The page is the same for every viewer, so it is
+# public. Flask-Login reads the session on every request, which would make
+# Flask add Vary: Cookie; PublicSessionInterface leaves that off public
+# responses that do not write the cookie.
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+UPLOAD_DIRS = ('featured_images/', 'profile_pics/')
+DEFAULT_IMAGES = ('default.jpg', 'default.png')
+PAGE_TEMPLATES = ('post_detail.html', 'post_detail_comment.html')
+
+
+class PublicSessionInterface(SecureCookieSessionInterface):
+    def save_session(self, app, session, response):
+        if response.cache_control.public:
+            if self.should_set_cookie(app, session):
+                # A response that writes the session cookie must never be shared
+                response.cache_control.public = False
+                response.cache_control.private = True
+            else:
+                session.accessed = False
+        super().save_session(app, session, response)
+
+
+def is_fingerprinted_upload(filename):
+    return filename.startswith(UPLOAD_DIRS) and os.path.basename(filename) not in DEFAULT_IMAGES
+
+
+def init_http_caching(app):
+    # Static files only change on deploy, which restarts the workers, so a
+    # per-process cache of their hashes never goes stale.
+    fingerprints = {}
+    app.session_interface = PublicSessionInterface()
+
+    # Post page ETags also change when the page templates do
+    templates = hashlib.sha256()
+    for name in PAGE_TEMPLATES:
+        with open(os.path.join(app.root_path, app.template_folder, name), 'rb') as f:
+            templates.update(f.read())
+    app.config.setdefault('PAGE_CACHE_VERSION', templates.hexdigest()[:12])
+
+    def static_fingerprint(filename):
+        if filename not in fingerprints:
+            path = os.path.join(app.static_folder, filename)
+            try:
+                with open(path, 'rb') as f:
+                    fingerprints[filename] = hashlib.sha256(f.read()).hexdigest()[:12]
+            except OSError:
+                fingerprints[filename] = None
+        return fingerprints[filename]
+
+    @app.url_defaults
+    def add_static_fingerprint(endpoint, values):
+        if endpoint != 'static' or 'v' in values:
+            return
+        filename = values.get('filename', '')
+        if is_fingerprinted_upload(filename):
+            return
+        fingerprint = static_fingerprint(filename)
+        if fingerprint:
+            values['v'] = fingerprint
+
+    @app.after_request
+    def static_cache_headers(response):
+        if request.endpoint == 'static' and response.status_code in (200, 304):
+            filename = (request.view_args or {}).get('filename', '')
+            if 'v' in request.args or is_fingerprinted_upload(filename):
+                response.headers['Cache-Control'] = IMMUTABLE
+                response.expires = None
+        return response
+
+
+def post_validators(post_id):
+    """Return (etag, last_modified) for a post page, or None if the post does not exist.
+
+    Covers the post, its author and every comment and commenter shown on the
+    page. The page does not depend on who is asking, so neither does the ETag.
+    """
+    author = aliased(User)
+    commenter = aliased(User)
+    comment_stats = (select(func.count(Comment.id), func.max(Comment.date), func.max(commenter.updated))
+                     .join(commenter, Comment.user_id == commenter.id)
+                     .where(Comment.blog_id == post_id)
+                     .subquery())
+    row = db.session.execute(
+        select(Post.updated, Post.date, author.updated, *comment_stats.c)
+        .join(author, Post.user_id == author.id)
+        .join(comment_stats, true())
+        .where(Post.id == post_id)
+    ).first()
+    if row is None:
+        return None
+    post_updated, post_date, author_updated, comment_count, last_comment, commenter_updated = row
+    last_modified = max(t for t in (post_updated, post_date, author_updated, last_comment, commenter_updated) if t)
+    tag = (f"{current_app.config['PAGE_CACHE_VERSION']}:{post_id}:{post_updated}:{author_updated}:"
+           f"{comment_count}:{last_comment}:{commenter_updated}")
+    return hashlib.sha1(tag.encode('utf-8')).hexdigest(), last_modified.replace(microsecond=0)
+
+
+def not_modified(etag, last_modified):
+    """True if the request's validators show the client already has this version."""
+    if request.if_none_match:
+        # Weak comparison: the compression middleware marks the ETag weak on encoded responses
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return request.if_modified_since.replace(tzinfo=None) >= last_modified
+    return False
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timedelta
+import click
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from routes.models_routes import StoredImage, Post, User, db
+from routes.image_variants import image_variants, VARIANTS, variant_filename
+
+# Content-addressed store for featured images.
+# Uploads are streamed to disk in chunks while being hashed and saved as
+# <sha256>.<ext>, so two authors uploading "image.png" no longer overwrite each
+# other and identical files are stored once. The stored_image table lists the
+# blobs on disk with a reference count kept in step with Post.image by the
+# mapper events below; the feed asks it (one IN query per page) instead of
+# calling os.path.exists for every card. `flask images gc` removes blobs no
+# post uses any more, and `flask images reconcile` compares table and folder.
+# The release step only runs the report: its filesystem is not the web
+# processes', so every upload would look missing there. Run --fix and
+# --delete-orphans by hand on a host that has the upload folder.
+
+CHUNK_SIZE = 64 * 1024
+
+
+def store_upload(file_storage, folder, extension):
+    """Stream an upload to ``folder`` under its content hash and return (filename, path)."""
+    digest = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        filename = f"{digest.hexdigest()}.{extension.lower()}"
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            # Same bytes are already stored; hash-named files never change
+            os.remove(tmp)
+        else:
+            os.replace(tmp, path)
+        return filename, path
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def register_image(path, filename):
+    """Record a stored blob; committed together with the caller's session.
+
+    The reference count starts at zero and is raised by the Post insert that
+    uses the blob, so an upload whose post never commits is left for gc.
+    """
+    values = dict(filename=filename, size=os.path.getsize(path), ref_count=0, created=datetime.utcnow())
+    dialect = db.session.get_bind().dialect.name
+    # Two uploads of the same bytes may race; insert-or-ignore keeps both transactions valid
+    if dialect == 'postgresql':
+        db.session.execute(postgresql.insert(StoredImage).values(**values).on_conflict_do_nothing())
+    elif dialect == 'sqlite':
+        db.session.execute(sqlite.insert(StoredImage).values(**values).on_conflict_do_nothing())
+    elif db.session.get(StoredImage, filename) is None:
+        db.session.add(StoredImage(**values))
+        db.session.flush()
+
+
+def known_variants(filename):
+    """Variants already built for a blob by an earlier post that uses it, if any."""
+    return db.session.query(Post.image_variants).filter(
+        Post.image == filename, Post.image_variants.isnot(None)).limit(1).scalar()
+
+
+def _adjust_refcount(connection, filename, delta):
+    if filename:
+        connection.execute(update(StoredImage)
+                           .where(StoredImage.filename == filename)
+                           .values(ref_count=StoredImage.ref_count + delta))
+
+
+@event.listens_for(Post, 'after_insert')
+def _acquire_on_insert(mapper, connection, post):
+    _adjust_refcount(connection, post.image, 1)
+
+
+@event.listens_for(Post, 'after_update')
+def _swap_on_update(mapper, connection, post):
+    history = db.inspect(post).attrs.image.history
+    if history.has_changes():
+        for old in history.deleted:
+            _adjust_refcount(connection, old, -1)
+        _adjust_refcount(connection, post.image, 1)
+
+
+@event.listens_for(Post, 'after_delete')
+def _release_on_delete(mapper, connection, post):
+    _adjust_refcount(connection, post.image, -1)
+
+
+def registered_images(filenames):
+    """Return the subset of filenames present in the registry."""
+    names = {name for name in filenames if name}
+    if not names:
+        return set()
+    rows = db.session.query(StoredImage.filename).filter(StoredImage.filename.in_(names))
+    return {row[0] for row in rows}
+
+
+def recount_references():
+    """Rebuild every ref_count from Post.image (bulk deletes and DB cascades skip the mapper events)."""
+    references = (select(func.count(Post.id))
+                  .where(Post.image == StoredImage.filename)
+                  .scalar_subquery())
+    db.session.execute(update(StoredImage).values(ref_count=references))
+
+
+def remove_blob(folder, filename):
+    for name in [filename] + [variant_filename(filename, v) for v in VARIANTS['featured']]:
+        try:
+            os.remove(os.path.join(folder, name))
+        except FileNotFoundError:
+            pass
+
+
+def scan_featured_images(folder):
+    return {entry.name: entry.stat().st_size
+            for entry in os.scandir(folder)
+            if entry.is_file() and not entry.name.startswith('.')}
+
+
+def image_commands(app):
+    @app.cli.group('images')
+    def images():
+        """Featured image registry maintenance."""
+
+    @images.command('reconcile')
+    @click.option('--fix', is_flag=True, help='Register unknown files and forget missing ones.')
+    @click.option('--delete-orphans', is_flag=True, help='Also delete files no post refers to.')
+    def reconcile(fix, delete_orphans):
+        """Report files missing from disk, unregistered files and orphaned files.
+
+        Only use --fix or --delete-orphans where FEATURED_IMAGE_FOLDER holds the real uploads.
+        """
+        folder = app.config['FEATURED_IMAGE_FOLDER']
+        on_disk = scan_featured_images(folder)
+        registered = {row[0] for row in db.session.query(StoredImage.filename)}
+        referenced = {row[0] for row in db.session.query(Post.image).filter(Post.image.isnot(None)).distinct()}
+
+        missing = sorted(registered - set(on_disk))
+        unregistered = sorted(set(on_disk) - registered)
+        orphaned = sorted(set(on_disk) - referenced)
+        dangling = sorted(referenced - set(on_disk))
+
+        click.echo(f"{len(on_disk)} files on disk, {len(registered)} registered, {len(referenced)} referenced by posts")
+        for label, names in (("missing from disk", missing), ("unregistered", unregistered),
+                             ("orphaned (no post)", orphaned), ("posts pointing at missing files", dangling)):
+            click.echo(f"{label}: {len(names)}")
+            for name in names:
+                click.echo(f"  {name}")
+
+        if fix:
+            if missing:
+                StoredImage.query.filter(StoredImage.filename.in_(missing)).delete(synchronize_session=False)
+            for name in unregistered:
+                db.session.add(StoredImage(filename=name, size=on_disk[name], ref_count=0))
+            db.session.flush()
+            recount_references()
+            db.session.commit()
+            click.echo(f"Registered {len(unregistered)} files, forgot {len(missing)} missing files.")
+
+        if delete_orphans:
+            for name in orphaned:
+                remove_blob(folder, name)
+            StoredImage.query.filter(StoredImage.filename.in_(orphaned)).delete(synchronize_session=False)
+            db.session.commit()
+            click.echo(f"Deleted {len(orphaned)} orphaned files.")
+
+    @images.command('gc')
+    @click.option('--grace-minutes', default=60, show_default=True,
+                  help='Keep unreferenced blobs younger than this; their post may still be committing.')
+    def gc(grace_minutes):
+        """Recount references and delete blobs that no post uses."""
+        recount_references()
+        cutoff = datetime.utcnow() - timedelta(minutes=grace_minutes)
+        unused = [row[0] for row in db.session.query(StoredImage.filename).filter(
+            StoredImage.ref_count <= 0, StoredImage.created < cutoff)]
+        folder = app.config['FEATURED_IMAGE_FOLDER']
+        for name in unused:
+            remove_blob(folder, name)
+        if unused:
+            StoredImage.query.filter(StoredImage.filename.in_(unused)).delete(synchronize_session=False)
+        db.session.commit()
+        click.echo(f"Released {len(unused)} unused images.")
+
+    @images.command('variants')
+    def build_variants():
+        """Generate resized variants for uploads that do not have them yet."""
+        if not image_variants.enabled:
+            raise click.ClickException("Image variants need Pillow and IMAGE_VARIANTS_ENABLED.")
+        jobs = [('featured', row[0]) for row in db.session.query(Post.image).filter(
+            Post.image.isnot(None), Post.image_variants.is_(None)).distinct()]
+        jobs += [('profile', row[0]) for row in db.session.query(User.profile_image).filter(
+            User.profile_image.isnot(None), User.profile_image != 'default.jpg',
+            User.avatar_variants.is_(None)).distinct()]
+        built = 0
+        for kind, filename in jobs:
+            try:
+                image_variants.generate_now(kind, filename)
+                built += 1
+            except (OSError, ValueError) as e:
+                click.echo(f"  skipped {kind}/{filename}: {e}")
+        click.echo(f"Built variants for {built} of {len(jobs)} images.")
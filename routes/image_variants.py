@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import url_for
+from routes.models_routes import Post, User, db
+from routes.session_users import invalidate_session_user
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it pages keep serving the originals
+    Image = None
+
+# Resized copies of uploaded images.
+# After an upload is committed the original is handed to a process pool that
+# writes fixed-size WebP variants next to it (re-encoding drops EXIF and other
+# metadata). When they are done the owning row records which variants exist,
+# and templates switch to them through variant_url()/variant_srcset(). The
+# upload request never waits for the resize.
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height); a height means crop to exactly that box
+VARIANTS = {
+    'featured': {
+        'card': (320, None),
+        'card-2x': (640, None),
+        'detail': (1200, None),
+    },
+    'profile': {
+        'avatar': (80, 80),
+        'avatar-lg': (240, 240),
+    },
+}
+
+STATIC_DIRS = {
+    'featured': 'featured_images',
+    'profile': 'profile_pics',
+}
+
+VARIANT_FORMAT = 'webp'
+
+
+def variant_filename(filename, name):
+    stem = os.path.splitext(filename)[0]
+    return f"variants/{stem}.{name}.{VARIANT_FORMAT}"
+
+
+def render_variants(source, folder, filename, specs, quality):
+    """Write every variant of ``source`` and return the names written. Runs in a pool process."""
+    written = []
+    os.makedirs(os.path.join(folder, 'variants'), exist_ok=True)
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+        for name, (width, height) in specs.items():
+            if height:
+                image = ImageOps.fit(original, (width, height), Image.LANCZOS)
+            else:
+                image = original.copy()
+                image.thumbnail((width, width * 4), Image.LANCZOS)
+            target = os.path.join(folder, variant_filename(filename, name))
+            tmp = f"{target}.tmp"
+            image.save(tmp, format=VARIANT_FORMAT, quality=quality, method=4)
+            os.replace(tmp, target)
+            written.append(name)
+    return written
+
+
+class ImageVariants:
+    def __init__(self):
+        self.app = None
+        self.workers = 1
+        self.quality = 80
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('IMAGE_VARIANTS_ENABLED', True)
+        app.config.setdefault('IMAGE_VARIANT_WORKERS', 1)
+        app.config.setdefault('IMAGE_VARIANT_QUALITY', 80)
+        self.app = app
+        self.workers = app.config['IMAGE_VARIANT_WORKERS']
+        self.quality = app.config['IMAGE_VARIANT_QUALITY']
+        app.jinja_env.globals['variant_url'] = variant_url
+        app.jinja_env.globals['variant_srcset'] = variant_srcset
+
+    @property
+    def enabled(self):
+        return Image is not None and self.app is not None and self.app.config['IMAGE_VARIANTS_ENABLED']
+
+    def _executor(self):
+        # Created lazily and per process, like the password hashing pool
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def folder(self, kind):
+        return self.app.config['FEATURED_IMAGE_FOLDER' if kind == 'featured' else 'UPLOAD_FOLDER']
+
+    def schedule(self, kind, filename):
+        """Queue variant generation for an uploaded file. Call after the upload is committed."""
+        if not self.enabled or not filename:
+            return None
+        folder = self.folder(kind)
+        future = self._executor().submit(render_variants, os.path.join(folder, filename), folder,
+                                         filename, VARIANTS[kind], self.quality)
+        future.add_done_callback(lambda f: self._record(kind, filename, f))
+        return future
+
+    def generate_now(self, kind, filename):
+        """Synchronous variant generation for the backfill command."""
+        folder = self.folder(kind)
+        names = render_variants(os.path.join(folder, filename), folder, filename, VARIANTS[kind], self.quality)
+        record_variants(kind, filename, names)
+        return names
+
+    def _record(self, kind, filename, future):
+        try:
+            names = future.result()
+        except Exception:
+            logger.exception("Could not build %s variants for %s", kind, filename)
+            return
+        with self.app.app_context():
+            try:
+                record_variants(kind, filename, names)
+            finally:
+                db.session.remove()
+
+
+def record_variants(kind, filename, names):
+    value = ','.join(names)
+    if kind == 'featured':
+        Post.query.filter(Post.image == filename).update({'image_variants': value}, synchronize_session=False)
+        db.session.commit()
+    else:
+        users = [row[0] for row in db.session.query(User.id).filter(User.profile_image == filename)]
+        User.query.filter(User.profile_image == filename).update({'avatar_variants': value},
+                                                                 synchronize_session=False)
+        db.session.commit()
+        # Avatars are part of the cached session user
+        for user_id in users:
+            invalidate_session_user(user_id)
+
+
+def _has(variants, name):
+    return bool(variants) and name in variants.split(',')
+
+
+def variant_url(kind, filename, variants, name):
+    """URL of a variant if it has been generated, otherwise of the original upload."""
+    folder = STATIC_DIRS[kind]
+    if _has(variants, name):
+        return url_for('static', filename=f"{folder}/{variant_filename(filename, name)}")
+    return url_for('static', filename=f"{folder}/{filename}")
+
+
+def variant_srcset(kind, filename, variants, names):
+    """srcset listing the generated variants among ``names``, or '' when there are none."""
+    folder = STATIC_DIRS[kind]
+    return ', '.join(
+        f"{url_for('static', filename=folder + '/' + variant_filename(filename, name))} {VARIANTS[kind][name][0]}w"
+        for name in names if _has(variants, name)
+    )
+
+
+image_variants = ImageVariants()
@@ -0,0 +1,214 @@
+import logging
+import re
+import threading
+import time
+from flask import g, has_app_context, request, request_started, request_finished, \
+    before_render_template, template_rendered, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per-request instrumentation.
+# Flask signals mark the start and end of each request and of every template
+# render, and SQLAlchemy cursor events time each statement. The totals for a
+# request are kept on g and, when the response body has been sent (so a
+# streamed page is measured to its end), folded into per-endpoint histograms
+# served at /metrics in the Prometheus text format.
+#
+# The N+1 detector counts statements by shape (the SQL with parameter lists
+# and numbers folded) and logs a warning for any shape that ran more than
+# N_PLUS_ONE_THRESHOLD times in one request.
+#
+# Nothing is connected for a feature that is switched off, so a disabled
+# feature costs nothing per request or per query. The histograms live in the
+# worker process: every gunicorn worker reports only the requests it served.
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (1024, 10240, 51200, 102400, 262144, 524288, 1048576)
+
+_PARAMS = re.compile(r'%\(\w+\)s|\$\d+|:\w+')
+_NUMBERS = re.compile(r'\b\d+\b')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+
+def statement_shape(statement):
+    """The statement with parameters, numbers and IN lists folded to ?."""
+    shape = _NUMBERS.sub('?', _PARAMS.sub('?', statement))
+    return ' '.join(_LISTS.sub('(?)', shape).split())
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._series = {}  # endpoint -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, value):
+        with self._lock:
+            series = self._series.get(endpoint)
+            if series is None:
+                series = self._series[endpoint] = [0] * len(self.buckets) + [0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((endpoint, list(values)) for endpoint, values in self._series.items())
+        for endpoint, values in series:
+            label = f'endpoint="{endpoint}"'
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {values[-1]}')
+            lines.append(f'{self.name}_sum{{{label}}} {values[-2]:g}')
+            lines.append(f'{self.name}_count{{{label}}} {values[-1]}')
+        return lines
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'sql_time', 'render_time', 'render_depth', 'render_started', 'shapes')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+        self.render_started = 0.0
+        self.shapes = {}
+
+
+def current_stats():
+    return g.get('_request_stats') if has_app_context() else None
+
+
+class Instrumentation:
+    def __init__(self):
+        self.metrics = False
+        self.sql = False
+        self.templates = False
+        self.n_plus_one_threshold = 0
+        self.histograms = {
+            'duration': Histogram('http_request_duration_seconds',
+                                  'Time from request start until the response body was sent.', DURATION_BUCKETS),
+            'queries': Histogram('http_request_sql_queries', 'SQL statements run per request.', QUERY_BUCKETS),
+            'sql_time': Histogram('http_request_sql_seconds', 'Time spent in SQL per request.', DURATION_BUCKETS),
+            'render_time': Histogram('http_request_render_seconds', 'Time spent rendering templates per request.',
+                                     DURATION_BUCKETS),
+            'size': Histogram('http_response_size_bytes', 'Response body size before compression.', SIZE_BUCKETS),
+        }
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', False)
+        app.config.setdefault('METRICS_SQL', True)
+        app.config.setdefault('METRICS_TEMPLATES', True)
+        app.config.setdefault('N_PLUS_ONE_THRESHOLD', 0)
+
+        self.metrics = app.config['METRICS_ENABLED']
+        self.sql = self.metrics and app.config['METRICS_SQL']
+        self.templates = self.metrics and app.config['METRICS_TEMPLATES']
+        self.n_plus_one_threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        if not self.metrics and not self.n_plus_one_threshold:
+            return
+
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+        if self.sql or self.n_plus_one_threshold:
+            # On the Engine class so every engine the app creates is covered
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        if self.templates:
+            before_render_template.connect(self._before_render, app)
+            template_rendered.connect(self._rendered, app)
+        if self.metrics:
+            app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    # ---------------------- SIGNALS ----------------------
+    def _request_started(self, sender, **extra):
+        g._request_stats = RequestStats()
+
+    def _request_finished(self, sender, response, **extra):
+        stats = current_stats()
+        if stats is None:
+            return
+        endpoint = request.endpoint or 'unmatched'
+        if response.is_streamed and response.content_length is None:
+            response.response = self._count_bytes(response.response, stats, endpoint)
+        else:
+            response.call_on_close(lambda: self._finish(stats, endpoint, response.content_length or 0))
+
+    def _count_bytes(self, chunks, stats, endpoint):
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+                yield chunk
+        finally:
+            self._finish(stats, endpoint, size)
+
+    def _before_render(self, sender, **extra):
+        stats = current_stats()
+        if stats is not None:
+            # Only the outermost render is timed; cards rendered inside a streamed page are part of it
+            if stats.render_depth == 0:
+                stats.render_started = time.perf_counter()
+            stats.render_depth += 1
+
+    def _rendered(self, sender, **extra):
+        stats = current_stats()
+        if stats is not None and stats.render_depth:
+            stats.render_depth -= 1
+            if stats.render_depth == 0:
+                stats.render_time += time.perf_counter() - stats.render_started
+
+    # ---------------------- SQL ----------------------
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if current_stats() is not None:
+            conn.info.setdefault('_instrument_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = current_stats()
+        started = conn.info.get('_instrument_started')
+        if stats is None or not started:
+            return
+        stats.queries += 1
+        stats.sql_time += time.perf_counter() - started.pop()
+        if self.n_plus_one_threshold:
+            shape = statement_shape(statement)
+            stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+
+    # ---------------------- RESULTS ----------------------
+    def _finish(self, stats, endpoint, size):
+        if self.n_plus_one_threshold:
+            for shape, count in stats.shapes.items():
+                if count > self.n_plus_one_threshold:
+                    logger.warning("Possible N+1 in %s: %d runs of %s", endpoint, count, shape[:300])
+        if not self.metrics:
+            return
+        self.histograms['duration'].observe(endpoint, time.perf_counter() - stats.started)
+        self.histograms['size'].observe(endpoint, size)
+        if self.sql:
+            self.histograms['queries'].observe(endpoint, stats.queries)
+            self.histograms['sql_time'].observe(endpoint, stats.sql_time)
+        if self.templates:
+            self.histograms['render_time'].observe(endpoint, stats.render_time)
+
+    def metrics_view(self):
+        lines = []
+        for name in ('duration', 'queries', 'sql_time', 'render_time', 'size'):
+            if name in ('queries', 'sql_time') and not self.sql:
+                continue
+            if name == 'render_time' and not self.templates:
+                continue
+            lines += self.histograms[name].render()
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+instrumentation = Instrumentation()
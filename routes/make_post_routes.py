@@ -1,8 +1,10 @@
-import os
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import current_user, login_required
-from werkzeug.utils import secure_filename
 from routes.models_routes import Post, db
+from routes.fragment_cache import fragment_cache
+from routes.image_store import store_upload, register_image, known_variants
+from routes.image_variants import image_variants
+from routes.taxonomy import normalize_tags, category_id_for, set_post_tags
 
 def make_post_routes(app):
     @app.route('/make_post', methods=['GET', 'POST'])
@@ -17,11 +19,11 @@ def make_post_routes(app):
 
             if post_featured_image and post_featured_image.filename != '':
                 if allowed_file(post_featured_image.filename):
-                    filename = secure_filename(post_featured_image.filename)
-                    image_path = os.path.join(app.config['FEATURED_IMAGE_FOLDER'], filename)
+                    extension = post_featured_image.filename.rsplit('.', 1)[1].lower()
                     try:
-                        post_featured_image.save(image_path)
-                        image_filename = filename
+                        image_filename, image_path = store_upload(
+                            post_featured_image, app.config['FEATURED_IMAGE_FOLDER'], extension)
+                        register_image(image_path, image_filename)
                     except Exception:
                         flash('Error saving image. Please try again.', 'danger')
                 else:
@@ -31,14 +33,22 @@ def make_post_routes(app):
             post_content = request.form.get('content')
             user_id = current_user.id
             category = request.form.get("category")
-            tags = request.form.getlist("tags")
+            tags = normalize_tags(request.form.getlist("tags"))
             excerpt = request.form.get("excerpt")
 
             if post_title and post_content:
                 try:
-                    new_post = Post(title=post_title, content=post_content, user_id=user_id, image=image_filename)
+                    # A re-upload of a stored image reuses the variants already built for it
+                    variants = known_variants(image_filename) if image_filename else None
+                    new_post = Post(title=post_title, content=post_content, user_id=user_id, image=image_filename,
+                                    excerpt=excerpt, image_variants=variants, category_id=category_id_for(category))
                     db.session.add(new_post)
+                    db.session.flush()
+                    set_post_tags(new_post, tags)
                     db.session.commit()
+                    fragment_cache.invalidate_posts([new_post.id])
+                    if image_filename and not variants:
+                        image_variants.schedule('featured', image_filename)
                     flash('Post created successfully!', 'success')
                     return redirect(url_for('make_post'))
                 except Exception:
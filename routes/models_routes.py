@@ -1,8 +1,9 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from routes.db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model, UserMixin):
     __tablename__ = 'users'  # changed from 'user' to 'users'
@@ -19,31 +20,96 @@ class User(db.Model, UserMixin):
     country = db.Column(db.String())
     city = db.Column(db.String())
     joined = db.Column(db.String())
+    avatar_variants = db.Column(db.String())
+    updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    posts = db.relationship('Post', back_populates='author', passive_deletes=True)
+    comments = db.relationship('Comment', back_populates='author', passive_deletes=True)
 
 class Link(db.Model):
     __tablename__ = 'link'
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False, index=True)
     website = db.Column(db.String())
     link = db.Column(db.String())
 
 class Skill(db.Model):
     __tablename__ = 'skill'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'skill', name='uq_skill_user_id_skill'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False, index=True)
     skill = db.Column(db.String())
 
 class Post(db.Model):
     __tablename__ = 'post'
+    __table_args__ = (
+        # Serves an author's posts newest first (profile page) as one index range
+        db.Index('ix_post_user_id_date', 'user_id', 'date'),
+        # Same for a category's feed
+        db.Index('ix_post_category_id_date', 'category_id', 'date'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False, index=True)
     title = db.Column(db.String())
     content = db.Column(db.String())
     image = db.Column(db.String())
-    date = db.Column(db.DateTime, default=datetime.utcnow)
-    category = db.Column(db.String())
-    tags = db.Column(db.String())
+    date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id', ondelete="SET NULL"))
     excerpt = db.Column(db.String())
+    word_count = db.Column(db.Integer)
+    read_time = db.Column(db.Integer)
+    image_variants = db.Column(db.String())
+    updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    author = db.relationship('User', back_populates='posts')
+    comments = db.relationship('Comment', back_populates='post', passive_deletes=True,
+                               order_by='Comment.date')
+    category = db.relationship('Category')
+    # Written through routes.taxonomy.set_post_tags, which keeps Tag.post_count in step
+    tags = db.relationship('Tag', secondary='post_tag', order_by='Tag.name', viewonly=True)
+
+class Category(db.Model):
+    __tablename__ = 'category'
+    id = db.Column(db.Integer, primary_key=True)
+    slug = db.Column(db.String(50), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+class Tag(db.Model):
+    __tablename__ = 'tag'
+    __table_args__ = (
+        # The tag cloud reads the most used tags straight off this index
+        db.Index('ix_tag_post_count_name', 'post_count', 'name'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(30), unique=True, nullable=False)
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+class PostTag(db.Model):
+    __tablename__ = 'post_tag'
+    __table_args__ = (
+        # A tag's posts newest first as one index range; date is copied from the post for this
+        db.Index('ix_post_tag_tag_id_date_post_id', 'tag_id', 'date', 'post_id'),
+    )
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete="CASCADE"), primary_key=True)
+    tag_id = db.Column(db.Integer, db.ForeignKey('tag.id', ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.DateTime, nullable=False)
+
+class PostScore(db.Model):
+    # Materialized trending ranking, one row per post; see routes.trending
+    __tablename__ = 'post_score'
+    __table_args__ = (
+        # The trending feed is a walk down this index
+        db.Index('ix_post_score_score_post_id', 'score', 'post_id'),
+    )
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.DateTime, nullable=False)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    score = db.Column(db.Float, nullable=False)
+    updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Comment(db.Model):
     __tablename__ = 'comment'
@@ -51,5 +117,16 @@ class Comment(db.Model):
     content = db.Column(db.Text, nullable=False)
     likes = db.Column(db.Integer, default=0)
     date = db.Column(db.DateTime, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
-    blog_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete="CASCADE"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False, index=True)
+    blog_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete="CASCADE"), nullable=False, index=True)
+
+    author = db.relationship('User', back_populates='comments')
+    post = db.relationship('Post', back_populates='comments')
+
+class StoredImage(db.Model):
+    # Content-addressed featured images on disk, so rendering never has to stat the file
+    __tablename__ = 'stored_image'
+    filename = db.Column(db.String(), primary_key=True)
+    size = db.Column(db.Integer)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created = db.Column(db.DateTime, default=datetime.utcnow)
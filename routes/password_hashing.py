@@ -0,0 +1,130 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; on Windows the cap only counts the jobs of one process
+    fcntl = None
+
+# bcrypt hashing off the request thread.
+# Hashing and checking run in a small process pool so a burst of logins cannot
+# pin every gunicorn worker on CPU. The number of in-flight jobs is capped
+# across all the workers on the machine: each job holds an flock on one of
+# PASSWORD_HASH_MAX_PENDING slot files under PASSWORD_HASH_SLOTS_PATH. When
+# every slot is taken, callers get HashingBusy straight away and the route
+# answers 503 instead of queueing indefinitely. A sync worker only ever has one
+# job of its own, so a per-process count would never reach the cap.
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class HashingSlots:
+    """At most `count` holders at a time among all processes sharing `path`."""
+
+    def __init__(self, path, count):
+        self.path = path
+        self.count = count
+        self._semaphore = threading.BoundedSemaphore(count) if fcntl is None else None
+        self._held = set()
+        if fcntl is not None:
+            os.makedirs(path, exist_ok=True)
+            # A forked child (a new pool process) would otherwise keep the parent's locks alive
+            os.register_at_fork(after_in_child=self._forget_held)
+
+    def acquire(self):
+        """Take a free slot without waiting; returns a token for release(), or None if all are held."""
+        if fcntl is None:
+            return True if self._semaphore.acquire(blocking=False) else None
+        for slot in range(self.count):
+            fd = os.open(os.path.join(self.path, f'{slot}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            self._held.add(fd)
+            return fd
+        return None
+
+    def release(self, token):
+        # Closing the descriptor drops the lock, as does the process dying
+        if fcntl is None:
+            self._semaphore.release()
+        else:
+            self._held.discard(token)
+            os.close(token)
+
+    def _forget_held(self):
+        # Closes only the child's copies; the lock stays with the parent's descriptor
+        for fd in list(self._held):
+            os.close(fd)
+        self._held.clear()
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.bcrypt = None
+        self.rounds = 12
+        self.workers = 0
+        self.timeout = 10
+        self._slots = None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, bcrypt):
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_MAX_PENDING', 8)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 10)
+        app.config.setdefault('PASSWORD_HASH_SLOTS_PATH', os.path.join(app.instance_path, 'password_hash_slots'))
+
+        self.bcrypt = bcrypt
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self._slots = HashingSlots(app.config['PASSWORD_HASH_SLOTS_PATH'], app.config['PASSWORD_HASH_MAX_PENDING'])
+
+    def _executor(self):
+        # Created lazily and per process: a pool inherited across gunicorn's fork is unusable.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        slot = self._slots.acquire()
+        if slot is None:
+            raise HashingBusy()
+        try:
+            future = self._executor().submit(fn, *args)
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The job keeps its slot until it actually finishes
+            future.add_done_callback(lambda _, held=slot: self._slots.release(held))
+            slot = None
+            raise HashingBusy()
+        finally:
+            if slot is not None:
+                self._slots.release(slot)
+
+    def hash_password(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def check_password(self, pw_hash, password):
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """True if pw_hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+        try:
+            return int(pw_hash.split('$')[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+
+password_hasher = PasswordHasher()
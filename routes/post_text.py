@@ -0,0 +1,82 @@
+import math
+import click
+from markupsafe import Markup
+from sqlalchemy import event
+from routes.models_routes import Post, db
+
+# Fields derived from a post's HTML body.
+# They are computed when a post is written so that feed and profile cards never
+# have to strip or measure the full content on render.
+
+EXCERPT_LENGTH = 150
+WORDS_PER_MINUTE = 200
+
+
+def plain_text(html):
+    return Markup(html or '').striptags()
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    if len(text) <= length:
+        return text
+    return text[:length - 3].rsplit(' ', 1)[0] + '...'
+
+
+def apply_derived_fields(post, excerpt=None):
+    """Fill excerpt, word_count and read_time on a post from its content.
+
+    An author-supplied excerpt is kept as-is; otherwise one is cut from the
+    plain text of the body.
+    """
+    text = plain_text(post.content)
+    post.word_count = len(text.split())
+    post.read_time = max(1, math.ceil(post.word_count / WORDS_PER_MINUTE))
+    if excerpt and excerpt.strip():
+        post.excerpt = excerpt.strip()
+    else:
+        post.excerpt = make_excerpt(text)
+
+
+@event.listens_for(Post, 'before_insert')
+def _derive_on_insert(mapper, connection, post):
+    if post.word_count is None:
+        apply_derived_fields(post, post.excerpt)
+
+
+@event.listens_for(Post, 'before_update')
+def _derive_on_update(mapper, connection, post):
+    content_history = db.inspect(post).attrs.content.history
+    if not content_history.has_changes():
+        return
+    excerpt_history = db.inspect(post).attrs.excerpt.history
+    if excerpt_history.has_changes():
+        apply_derived_fields(post, post.excerpt)
+        return
+    # Regenerate the excerpt only if it was generated from the old body, so a
+    # custom excerpt survives an edit of the content.
+    old_content = content_history.deleted[0] if content_history.deleted else None
+    generated = make_excerpt(plain_text(old_content))
+    apply_derived_fields(post, None if post.excerpt in (None, generated) else post.excerpt)
+
+
+def post_text_commands(app):
+    @app.cli.command('backfill-post-fields')
+    @click.option('--batch-size', default=500, show_default=True)
+    def backfill_post_fields(batch_size):
+        """Compute excerpt, word count and read time for posts that lack them."""
+        updated = 0
+        last_id = 0
+        while True:
+            posts = (Post.query
+                     .filter(Post.id > last_id, Post.word_count.is_(None))
+                     .order_by(Post.id)
+                     .limit(batch_size)
+                     .all())
+            if not posts:
+                break
+            for post in posts:
+                apply_derived_fields(post, post.excerpt)
+            db.session.commit()
+            updated += len(posts)
+            last_id = posts[-1].id
+        click.echo(f"Backfilled {updated} posts.")
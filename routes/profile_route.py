@@ -1,9 +1,72 @@
 from flask import render_template, request, redirect, url_for,flash
-from flask_login import current_user, login_required
+from flask_login import login_required
 from werkzeug.utils import secure_filename
 import os
 import time
-from routes.models_routes import db, Link, Skill, Post
+import logging
+from collections import namedtuple
+from sqlalchemy import select, literal, null, delete, insert
+from routes.models_routes import db, Link, Skill
+from routes.feed import comment_counts, count_user_posts, fetch_user_posts_page, page_size
+from routes.fragment_cache import fragment_cache, invalidate_author_cards
+from routes.session_users import load_full_user, invalidate_session_user
+from routes.image_variants import image_variants
+
+logger = logging.getLogger(__name__)
+
+ProfileLink = namedtuple('ProfileLink', ['id', 'website', 'link'])
+
+
+def load_links_and_skills(user_id):
+    """Return (links, skill names) for a user in a single UNION ALL round-trip."""
+    links_query = select(literal('link').label('kind'), Link.id, Link.website, Link.link).where(Link.user_id == user_id)
+    skills_query = select(literal('skill').label('kind'), Skill.id, Skill.skill, null()).where(Skill.user_id == user_id)
+    rows = db.session.execute(links_query.union_all(skills_query).order_by('kind', 'id')).all()
+
+    links = [ProfileLink(row[1], row[2], row[3]) for row in rows if row[0] == 'link']
+    skills = [row[2] for row in rows if row[0] == 'skill']
+    return links, skills
+
+
+def reconcile_skills(user_id, wanted):
+    """Make the user's skills equal to ``wanted`` with one bulk DELETE and one bulk INSERT.
+
+    Returns True if anything changed. The caller commits.
+    """
+    existing = set(db.session.scalars(select(Skill.skill).where(Skill.user_id == user_id)))
+    to_remove = existing - wanted
+    to_add = wanted - existing
+    if to_remove:
+        db.session.execute(delete(Skill).where(Skill.user_id == user_id, Skill.skill.in_(to_remove)))
+    if to_add:
+        db.session.execute(insert(Skill), [{"user_id": user_id, "skill": skill} for skill in sorted(to_add)])
+    logger.debug("Skills for user %s: +%s -%s", user_id, to_add, to_remove)
+    return bool(to_add or to_remove)
+
+
+def reconcile_links(user_id, wanted):
+    """Make the user's links equal to the (website, link) pairs in ``wanted``.
+
+    Duplicate rows for the same pair are removed as well. Returns True if
+    anything changed. The caller commits.
+    """
+    seen = set()
+    stale_ids = []
+    for link_id, website, link_url in db.session.execute(
+            select(Link.id, Link.website, Link.link).where(Link.user_id == user_id).order_by(Link.id)):
+        pair = (website, link_url)
+        if pair in wanted and pair not in seen:
+            seen.add(pair)
+        else:
+            stale_ids.append(link_id)
+    to_add = wanted - seen
+    if stale_ids:
+        db.session.execute(delete(Link).where(Link.id.in_(stale_ids)))
+    if to_add:
+        db.session.execute(insert(Link), [{"user_id": user_id, "website": website, "link": link_url}
+                                          for website, link_url in sorted(to_add)])
+    logger.debug("Links for user %s: +%s -%s", user_id, to_add, stale_ids)
+    return bool(to_add or stale_ids)
 
 
 def edit_profile(app):
@@ -11,9 +74,12 @@ def edit_profile(app):
         return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
     @app.route('/editing_profile', methods=['GET', 'POST'])
+    @login_required
     def editing_profile_page():
+        user = load_full_user()
         if request.method == 'POST':
             updated = False
+            new_avatar = None
             if 'profile_picture' in request.files:
                 file = request.files['profile_picture']
                 if file and file.filename != '':
@@ -21,16 +87,18 @@ def edit_profile(app):
                         try:
                             # Generate unique filename to avoid conflicts
                             file_text = os.path.splitext(file.filename)[1]
-                            filename = secure_filename(f"{current_user.id}_{int(time.time())}{file_text}")
+                            filename = secure_filename(f"{user.id}_{int(time.time())}{file_text}")
                             file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
                             # Save file
                             file.save(file_path)
                             # Update database
-                            current_user.profile_image = filename
+                            user.profile_image = filename
+                            user.avatar_variants = None
+                            new_avatar = filename
                             flash('Profile picture updated successfully!', 'success')
                             updated = True
-                        except Exception as e:
-                            print(f"Error saving file: {str(e)}")
+                        except Exception:
+                            logger.exception("Error saving profile picture")
                             flash('Error updating profile picture', 'error')
                     else:
                         flash('Invalid file type', 'error')
@@ -39,137 +107,104 @@ def edit_profile(app):
 
             # Handle skills FIRST (before any redirects)
             skills = request.form.getlist('skills')
-            print("=== SKILLS DEBUG ===")
-            print("Skills received:", skills)
-            print("Number of skills:", len(skills))
-
-            # Clear existing skills and add new ones
-            skills_updated = False
-            if skills:
-                # First, clear all existing skills for this user
-                Skill.query.filter_by(user_id=current_user.id).delete()
-
-                # Add new skills
-                for skill in skills:
-                    if skill and skill.strip():  # Check if skill is not empty
-                        print(f"Adding skill: '{skill}'")
-                        new_skill = Skill(user_id=current_user.id, skill=skill.strip())
-                        db.session.add(new_skill)
-                        skills_updated = True
-
-                if skills_updated:
-                    flash('Skills updated successfully!', 'success')
-                    updated = True
+            logger.debug("Skills received: %s", skills)
+
+            # Apply only the difference between the submitted and stored skills
+            wanted_skills = {skill.strip() for skill in skills if skill and skill.strip()}
+            if wanted_skills and reconcile_skills(user.id, wanted_skills):
+                flash('Skills updated successfully!', 'success')
+                updated = True
 
             username = request.form.get('user_name')
-            if username and current_user.user_name != username:
-                current_user.user_name = username
+            if username and user.user_name != username:
+                user.user_name = username
                 flash('Username updated successfully!', 'success')
                 updated = True
 
             about = request.form.get('about')
-            if about and current_user.about != about:
-                current_user.about = about
+            if about and user.about != about:
+                user.about = about
                 flash('Your about updated successfully!', 'success')
                 updated = True
 
             profession = request.form.get('profession')
-            if profession and current_user.profession != profession:
-                current_user.profession = profession
+            if profession and user.profession != profession:
+                user.profession = profession
                 flash('Your profession updated successfully!', 'success')
                 updated = True
 
             bio = request.form.get('bio')
-            if bio and current_user.bio != bio:
-                current_user.bio = bio
+            if bio and user.bio != bio:
+                user.bio = bio
                 flash('Your bio updated successfully!', 'success')
                 updated = True
 
             education = request.form.get('education')
-            if education and current_user.education != education:
-                current_user.education = education
+            if education and user.education != education:
+                user.education = education
                 flash('Your education updated successfully!', 'success')
                 updated = True
 
             country = request.form.get('country')
-            if country and current_user.country != country:
-                current_user.country = country
+            if country and user.country != country:
+                user.country = country
                 flash('Your location updated successfully!', 'success')
                 updated = True
 
             city = request.form.get('city')
-            if city and current_user.city != city:
-                current_user.city = city
+            if city and user.city != city:
+                user.city = city
                 flash('Your location updated successfully!', 'success')
                 updated = True
 
             # Handle links
             websites = request.form.getlist('website')
             links = request.form.getlist('link')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Profile form: %s", dict(request.form))
+                logger.debug("Websites: %s, links: %s", websites, links)
 
-            print(f"DEBUG - All form data: {dict(request.form)}")
-            print(f"DEBUG - Websites list: {websites}")
-            print(f"DEBUG - Links list: {links}")
-            print(f"DEBUG - Number of websites: {len(websites)}")
-            print(f"DEBUG - Number of links: {len(links)}")
-
-            # Clear existing links first
-            Link.query.filter_by(user_id=current_user.id).delete()
-
-            # Add new links
-            links_added = False
-            for i, (website, link_url) in enumerate(zip(websites, links)):
-                print(f"DEBUG - Processing link {i}: website='{website}', link='{link_url}'")
-
-                # Clean the data
+            # Only pairs with both fields filled count; empty rows in the form are ignored
+            wanted_links = set()
+            for website, link_url in zip(websites, links):
                 website = website.strip() if website else ''
                 link_url = link_url.strip() if link_url else ''
-
-                # Only add if both fields have values
                 if website and link_url:
-                    try:
-                        new_link = Link(user_id=current_user.id, website=website, link=link_url)
-                        db.session.add(new_link)
-                        links_added = True
-                        print(f'DEBUG - Link added: {website} - {link_url}')
-                    except Exception as e:
-                        print(f"Error adding link: {e}")
-                else:
-                    print(f"DEBUG - Skipping empty link: website='{website}', link='{link_url}'")
-
-            if links_added:
+                    wanted_links.add((website, link_url))
+
+            # An empty set is reconciled too: it removes every link
+            links_posted = 'links_posted' in request.form or 'link' in request.form
+            if links_posted and reconcile_links(user.id, wanted_links):
                 flash('Social links updated successfully!', 'success')
-                print("DEBUG - Links committed to database")
                 updated = True
-            else:
-                print("DEBUG - No valid links provided")
 
             # COMMIT ALL CHANGES AT ONCE
             if updated:
                 db.session.commit()
+                invalidate_author_cards(user.id)
+                invalidate_session_user(user.id)
+                image_variants.schedule('profile', new_avatar)
                 return redirect(url_for('editing_profile_page'))
             else:
                 flash("No changes were made.", "info")
                 return redirect(url_for('editing_profile_page'))
 
         # GET request - show the form
-        user_links = Link.query.filter_by(user_id=current_user.id).all()
-        user_skills = Skill.query.filter_by(user_id=current_user.id).all()
+        user_links, user_skills = load_links_and_skills(user.id)
 
-        print(user_links)
         user_info = {
-            "fullname": current_user.fullname,
-            "email": current_user.email,
-            "profile_image": current_user.profile_image,
-            "user_name": current_user.user_name,
-            "about": current_user.about,
-            "profession": current_user.profession,
-            "bio": current_user.bio,
-            "education": current_user.education,
-            "country": current_user.country,
-            "city": current_user.city,
+            "fullname": user.fullname,
+            "email": user.email,
+            "profile_image": user.profile_image,
+            "user_name": user.user_name,
+            "about": user.about,
+            "profession": user.profession,
+            "bio": user.bio,
+            "education": user.education,
+            "country": user.country,
+            "city": user.city,
             "links": user_links,
-            "skills": [skill.skill for skill in user_skills],  # Convert to list of skill strings
+            "skills": user_skills,
         }
 
         return render_template('edite_profile.html', user_info=user_info)
@@ -179,25 +214,39 @@ def edit_profile(app):
     @app.route('/profile')
     @login_required
     def user_profile():
-        user_links = Link.query.filter_by(user_id=current_user.id).all()
-        user_skills = Skill.query.filter_by(user_id=current_user.id).all()
-        user_all_blogs = Post.query.filter_by(user_id=current_user.id).all()
+        user = load_full_user()
+        user_links, user_skills = load_links_and_skills(user.id)
+        user_posts, next_cursor = fetch_user_posts_page(
+            user.id, page_size(app, request.args.get('limit'), 'PROFILE_PAGE_SIZE'), request.args.get('cursor'))
 
         user_info = {
-            "fullname": current_user.fullname,
-            "email": current_user.email,
-            "profile_image": current_user.profile_image,
-            "user_name": current_user.user_name,
-            "about": current_user.about,
-            "profession": current_user.profession,
-            "bio": current_user.bio,
-            "education": current_user.education,
-            "location": f"{current_user.country} || {current_user.city}",
-            "joined": current_user.joined,
+            "fullname": user.fullname,
+            "email": user.email,
+            "profile_image": user.profile_image,
+            "user_name": user.user_name,
+            "about": user.about,
+            "profession": user.profession,
+            "bio": user.bio,
+            "education": user.education,
+            "avatar_variants": user.avatar_variants,
+            "location": f"{user.country} || {user.city}",
+            "joined": user.joined,
             "links": user_links,
-            "skills": [skill.skill for skill in user_skills],
-            "user_all_blogs": str(len(user_all_blogs)),
-            "user_posts": user_all_blogs
+            "skills": user_skills,
+            "user_all_blogs": str(count_user_posts(user.id)),
+            "user_posts": user_posts,
+            "next_cursor": next_cursor,
         }
 
+        counts = comment_counts([post.id for post in user_posts])
+        user_info["post_cards"] = [
+            fragment_cache.get_or_render(
+                'profile_card', post.id,
+                (post.title, post.date, post.read_time, post.excerpt,
+                 user.fullname, user.profile_image, user.avatar_variants, counts.get(post.id, 0)),
+                lambda post=post: render_template('profile_post_card.html', post=post, author=user,
+                                                  comment_count=counts.get(post.id, 0)))
+            for post in user_posts
+        ]
+
         return render_template('profile.html', user_info=user_info)
@@ -0,0 +1,217 @@
+import re
+from types import SimpleNamespace
+import click
+from flask import request, jsonify, url_for
+from flask_login import login_required
+from markupsafe import Markup, escape
+from sqlalchemy import event, text
+from routes.models_routes import Post, User, db
+from routes.post_text import plain_text
+from routes.feed import page_size
+
+# Full-text search over posts.
+# The index lives in a post_search table holding the plain text of each
+# post's title and body: an FTS5 virtual table on SQLite (rowid = post id) and
+# a table with a weighted tsvector column and a GIN index on Postgres. Post
+# mapper events keep it in step with ORM inserts, edits and deletes; bulk
+# inserts and database-level cascades bypass them, so `flask search rebuild`
+# re-indexes everything (the seed command runs it). Results are ranked by
+# bm25 / ts_rank_cd with titles weighted above bodies, and only the page
+# being returned gets highlighted snippets.
+
+SEARCH_TABLE = 'post_search'
+
+SQLITE_DDL = ("CREATE VIRTUAL TABLE IF NOT EXISTS post_search USING fts5("
+              "title, body, tokenize = 'porter unicode61 remove_diacritics 2')",)
+POSTGRES_DDL = (
+    "CREATE TABLE IF NOT EXISTS post_search ("
+    "post_id INTEGER PRIMARY KEY REFERENCES post (id) ON DELETE CASCADE, "
+    "title TEXT NOT NULL DEFAULT '', "
+    "body TEXT NOT NULL DEFAULT '', "
+    "document tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')) STORED)",
+    "CREATE INDEX IF NOT EXISTS ix_post_search_document ON post_search USING GIN (document)",
+)
+
+# Snippet highlights are marked with control characters, escaped, then turned into <mark>
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_WORDS = 24
+RESULT_COLUMNS = {'id': db.Integer, 'title': db.String, 'date': db.DateTime, 'fullname': db.String,
+                  'snippet': db.String}
+
+
+def search_ddl(dialect_name):
+    return POSTGRES_DDL if dialect_name == 'postgresql' else SQLITE_DDL
+
+
+def exclude_search_index(object, name, type_, reflected, compare_to):
+    """Alembic include_object hook: the search table (and FTS5's shadow tables) is not in the models."""
+    return not (type_ == 'table' and name and name.startswith(SEARCH_TABLE))
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_search_index(target, connection, **kw):
+    # Databases built with create_all() rather than the migrations
+    for statement in search_ddl(connection.dialect.name):
+        connection.execute(text(statement))
+
+
+# ---------------------- INDEX UPDATES ----------------------
+def index_post(connection, post_id, title, content):
+    params = {'id': post_id, 'title': title or '', 'body': str(plain_text(content))}
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text(
+            "INSERT INTO post_search (post_id, title, body) VALUES (:id, :title, :body) "
+            "ON CONFLICT (post_id) DO UPDATE SET title = excluded.title, body = excluded.body"), params)
+    else:
+        connection.execute(text("DELETE FROM post_search WHERE rowid = :id"), params)
+        connection.execute(text("INSERT INTO post_search (rowid, title, body) VALUES (:id, :title, :body)"), params)
+
+
+def unindex_post(connection, post_id):
+    key = 'post_id' if connection.dialect.name == 'postgresql' else 'rowid'
+    connection.execute(text(f"DELETE FROM post_search WHERE {key} = :id"), {'id': post_id})
+
+
+@event.listens_for(Post, 'after_insert')
+def _index_on_insert(mapper, connection, post):
+    index_post(connection, post.id, post.title, post.content)
+
+
+@event.listens_for(Post, 'after_update')
+def _reindex_on_update(mapper, connection, post):
+    state = db.inspect(post)
+    if state.attrs.title.history.has_changes() or state.attrs.content.history.has_changes():
+        index_post(connection, post.id, post.title, post.content)
+
+
+@event.listens_for(Post, 'after_delete')
+def _unindex_on_delete(mapper, connection, post):
+    unindex_post(connection, post.id)
+
+
+def rebuild_search_index(batch_size=1000, echo=lambda message: None):
+    """Recreate the index from the post table. Returns the number of posts indexed."""
+    connection = db.session.connection()
+    for statement in search_ddl(connection.dialect.name):
+        connection.execute(text(statement))
+    connection.execute(text("DELETE FROM post_search"))
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = (db.session.query(Post.id, Post.title, Post.content)
+                .filter(Post.id > last_id).order_by(Post.id).limit(batch_size).all())
+        if not rows:
+            break
+        for post_id, title, content in rows:
+            index_post(connection, post_id, title, content)
+        indexed += len(rows)
+        last_id = rows[-1][0]
+        echo(f"Indexed {indexed} posts.")
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("INSERT INTO post_search (post_search) VALUES ('optimize')"))
+    db.session.commit()
+    return indexed
+
+
+# ---------------------- QUERIES ----------------------
+def fts5_query(q):
+    """Turn user input into an FTS5 query: every word must match, the last one as a prefix."""
+    words = re.findall(r'\w+', q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    return Markup(str(escape(snippet or ''))
+                  .replace(HIGHLIGHT_START, '<mark>')
+                  .replace(HIGHLIGHT_END, '</mark>'))
+
+
+def search_posts(q, limit, offset=0):
+    """Return (results, has_more) for one page of posts matching q, best match first."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        rows = _search_postgres(q, limit + 1, offset)
+    else:
+        rows = _search_sqlite(q, limit + 1, offset)
+    results = [{
+        'id': row.id,
+        'title': row.title,
+        'author': row.fullname,
+        'date': row.date,
+        'snippet': highlight(row.snippet),
+    } for row in rows[:limit]]
+    return results, len(rows) > limit
+
+
+def _search_sqlite(q, limit, offset):
+    match = fts5_query(q)
+    if match is None:
+        return []
+    # On its own the FTS5 query only evaluates snippet() for the rows left after the LIMIT;
+    # joined or wrapped in a CTE it ran for every match, so the posts are fetched separately
+    ranked = db.session.execute(text(
+        f"SELECT rowid, snippet(post_search, 1, :start, :end, '…', {SNIPPET_WORDS}) "
+        "FROM post_search WHERE post_search MATCH :match "
+        "ORDER BY bm25(post_search, 10.0, 1.0), rowid DESC LIMIT :limit OFFSET :offset"),
+        {'match': match, 'start': HIGHLIGHT_START, 'end': HIGHLIGHT_END, 'limit': limit, 'offset': offset}).all()
+    if not ranked:
+        return []
+    posts = {row.id: row for row in db.session.execute(
+        db.select(Post.id, Post.title, Post.date, User.fullname)
+        .join(User, User.id == Post.user_id)
+        .where(Post.id.in_([post_id for post_id, _ in ranked])))}
+    return [SimpleNamespace(**posts[post_id]._asdict(), snippet=snippet)
+            for post_id, snippet in ranked if post_id in posts]
+
+
+def _search_postgres(q, limit, offset):
+    options = (f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_WORDS}, "
+               f"MinWords={SNIPPET_WORDS // 2}, MaxFragments=2, FragmentDelimiter=\" … \"")
+    return db.session.execute(text(
+        "SELECT post.id, post.title, post.date, users.fullname, "
+        "ts_headline('english', post_search.body, websearch_to_tsquery('english', :q), :options) AS snippet "
+        "FROM (SELECT post_id, ts_rank_cd(document, websearch_to_tsquery('english', :q)) AS score "
+        "      FROM post_search WHERE document @@ websearch_to_tsquery('english', :q) "
+        "      ORDER BY score DESC, post_id DESC LIMIT :limit OFFSET :offset) AS ranked "
+        "JOIN post_search ON post_search.post_id = ranked.post_id "
+        "JOIN post ON post.id = ranked.post_id JOIN users ON users.id = post.user_id "
+        "ORDER BY ranked.score DESC, ranked.post_id DESC").columns(**RESULT_COLUMNS),
+        {'q': q, 'options': options, 'limit': limit, 'offset': offset}).all()
+
+
+def search_route(app):
+    @app.route('/api/search')
+    @login_required
+    def search_api():
+        q = request.args.get('q', '').strip()
+        try:
+            page = max(1, int(request.args.get('page', 1)))
+        except ValueError:
+            page = 1
+        if not q:
+            return jsonify({'results': [], 'next_page': None})
+        limit = page_size(app, request.args.get('limit'))
+        results, has_more = search_posts(q, limit, (page - 1) * limit)
+        for result in results:
+            result['snippet'] = str(result['snippet'])
+            result['date'] = result['date'].strftime('%B %d, %Y')
+            result['url'] = url_for('post_detail', post_id=result['id'])
+        return jsonify({'results': results, 'next_page': page + 1 if has_more else None})
+
+
+def search_commands(app):
+    @app.cli.group('search')
+    def search_group():
+        """Maintain the post search index."""
+
+    @search_group.command('rebuild')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def rebuild(batch_size):
+        """Re-index every post."""
+        indexed = rebuild_search_index(batch_size, click.echo)
+        click.echo(f"Search index rebuilt: {indexed} posts.")
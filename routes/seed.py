@@ -0,0 +1,187 @@
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+import click
+from sqlalchemy import insert, select, func
+from routes.models_routes import User, Link, Skill, Post, PostTag, Comment, db
+from routes.password_hashing import password_hasher
+from routes.post_text import plain_text, make_excerpt, WORDS_PER_MINUTE
+from routes.fragment_cache import fragment_cache
+from routes.search import rebuild_search_index
+from routes.trending import recompute_scores
+from routes.taxonomy import CATEGORIES, category_id_for, tag_ids_for, recount_taxonomy
+
+# Synthetic data for load testing.
+# `flask seed` bulk-inserts users (with skills and links), posts and comments
+# through Core executemany inserts, so it skips the ORM unit of work and its
+# mapper events; the derived post fields are filled in here instead, and the
+# tag counts, the search index and the trending scores are rebuilt at the end. Every post gets a
+# category and one to four tags drawn from the same word list as the text. Comments follow a Zipf distribution over
+# the posts, so a few posts get most of them.
+# Everything comes from one random seed, so the same options give the same data.
+# All seeded users share the password SEED_PASSWORD.
+
+SEED_PASSWORD = 'password'
+SEED_EMAIL = 'seed-user-{}@example.com'
+
+SCALES = {
+    # name -> (users, posts)
+    'small': (100, 1000),
+    'medium': (1000, 10000),
+    'large': (5000, 100000),
+    'huge': (20000, 1000000),
+}
+
+WORDS = ('performance latency database index query cache render stream feed post comment author reader '
+         'profile image page request response memory pool worker batch write read scale metric budget '
+         'design system network browser server python flask template signal event test deploy').split()
+SKILLS = ('Python', 'Flask', 'SQL', 'Writing', 'Design', 'Photography', 'Editing', 'Research', 'Marketing',
+          'JavaScript', 'Data', 'Travel')
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def post_body(rng):
+    paragraphs = (' '.join(sentence(rng, rng.randint(8, 18)) for _ in range(rng.randint(3, 6)))
+                  for _ in range(rng.randint(3, 8)))
+    return ''.join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+
+
+def insert_batches(model, rows, batch_size):
+    """Insert an iterable of row dicts in executemany batches. Returns the number inserted."""
+    count = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return count
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        count += len(batch)
+
+
+def new_ids(model, after):
+    return db.session.scalars(select(model.id).where(model.id > after).order_by(model.id)).all()
+
+
+def zipf_weights(n, skew):
+    weights = [1 / (rank ** skew) for rank in range(1, n + 1)]
+    return list(itertools.accumulate(weights))
+
+
+def seed_database(users, posts, comments_per_post, skew, days, batch_size, rng, echo=lambda message: None):
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=days)
+    password = password_hasher.hash_password(SEED_PASSWORD)
+
+    first_user = (db.session.scalar(select(func.max(User.id))) or 0)
+    offset = db.session.scalar(select(func.count(User.id)).where(User.email.like(SEED_EMAIL.format('%')))) or 0
+    insert_batches(User, ({
+        'fullname': f"{sentence(rng, 1)[:-1]} {sentence(rng, 1)[:-1]}",
+        'email': SEED_EMAIL.format(offset + i),
+        'password': password,
+        'profile_image': 'default.jpg',
+        'user_name': f"seed{offset + i}",
+        'bio': sentence(rng, 12),
+        'about': sentence(rng, 20),
+        'profession': rng.choice(SKILLS),
+        'country': 'Testland',
+        'city': 'Benchville',
+        'joined': str(start.date()),
+        'updated': now,
+    } for i in range(users)), batch_size)
+    user_ids = new_ids(User, first_user)
+    echo(f"Inserted {len(user_ids)} users.")
+
+    insert_batches(Skill, ({'user_id': user_id, 'skill': skill}
+                           for user_id in user_ids for skill in rng.sample(SKILLS, 3)), batch_size)
+    insert_batches(Link, ({'user_id': user_id, 'website': website, 'link': f"https://{website}.example.com/{user_id}"}
+                          for user_id in user_ids for website in ('blog', 'github')), batch_size)
+    echo("Inserted skills and links.")
+
+    category_ids = [category_id_for(slug) for slug in CATEGORIES]
+    tags = tag_ids_for(WORDS)
+    tag_ids = [tags[word] for word in WORDS]
+
+    # Posts are spread evenly over the period, oldest first, so ids follow dates
+    first_post = db.session.scalar(select(func.max(Post.id))) or 0
+    step = timedelta(days=days) / max(posts, 1)
+
+    def post_rows():
+        for i in range(posts):
+            content = post_body(rng)
+            text = plain_text(content)
+            word_count = len(text.split())
+            date = start + step * i
+            yield {
+                'user_id': rng.choice(user_ids),
+                'category_id': rng.choice(category_ids),
+                'title': sentence(rng, rng.randint(4, 9))[:-1],
+                'content': content,
+                'date': date,
+                'updated': date,
+                'excerpt': make_excerpt(text),
+                'word_count': word_count,
+                'read_time': max(1, math.ceil(word_count / WORDS_PER_MINUTE)),
+            }
+
+    insert_batches(Post, post_rows(), batch_size)
+    post_ids = new_ids(Post, first_post)
+    echo(f"Inserted {len(post_ids)} posts.")
+
+    insert_batches(PostTag, ({'post_id': post_id, 'tag_id': tag_id, 'date': start + step * i}
+                             for i, post_id in enumerate(post_ids)
+                             for tag_id in rng.sample(tag_ids, rng.randint(1, 4))), batch_size)
+    recount_taxonomy()
+    db.session.commit()
+    echo("Tagged posts.")
+
+    # Which posts are popular is random; how popular follows the Zipf weights
+    hot = post_ids[:]
+    rng.shuffle(hot)
+    cumulative = zipf_weights(len(hot), skew)
+    first_index = {post_id: i for i, post_id in enumerate(post_ids)}
+
+    def comment_rows():
+        for post_id in rng.choices(hot, cum_weights=cumulative, k=int(len(post_ids) * comments_per_post)):
+            posted = start + step * first_index[post_id]
+            yield {
+                'user_id': rng.choice(user_ids),
+                'blog_id': post_id,
+                'content': sentence(rng, rng.randint(4, 20)),
+                'likes': 0,
+                'date': min(now, posted + timedelta(minutes=rng.randint(1, 60 * 24 * 7))),
+            }
+
+    comments = insert_batches(Comment, comment_rows(), batch_size)
+    echo(f"Inserted {comments} comments.")
+    return {'users': len(user_ids), 'posts': len(post_ids), 'comments': comments}
+
+
+def seed_commands(app):
+    @app.cli.command('seed')
+    @click.option('--scale', type=click.Choice(sorted(SCALES)), default='small', show_default=True,
+                  help='Preset number of users and posts.')
+    @click.option('--users', type=int, help='Override the number of users.')
+    @click.option('--posts', type=int, help='Override the number of posts.')
+    @click.option('--comments-per-post', default=3.0, show_default=True, help='Average comments per post.')
+    @click.option('--skew', default=1.1, show_default=True, help='Zipf exponent of comments over posts.')
+    @click.option('--days', default=365, show_default=True, help='Period the posts are spread over.')
+    @click.option('--batch-size', default=5000, show_default=True)
+    @click.option('--seed', 'random_seed', default=42, show_default=True)
+    def seed(scale, users, posts, comments_per_post, skew, days, batch_size, random_seed):
+        """Bulk-insert synthetic users, skills, links, posts and comments."""
+        default_users, default_posts = SCALES[scale]
+        counts = seed_database(users or default_users, posts or default_posts, comments_per_post, skew, days,
+                               batch_size, random.Random(random_seed), click.echo)
+        # Cards cached from before the seed would not match the new feed
+        fragment_cache.backend.clear()
+        indexed = rebuild_search_index()
+        click.echo(f"Indexed {indexed} posts for search.")
+        scored = recompute_scores(batch_size)
+        click.echo(f"Scored {scored} posts for trending.")
+        click.echo(f"Seeded {counts['users']} users, {counts['posts']} posts and {counts['comments']} comments. "
+                   f"Log in as {SEED_EMAIL.format(0)} / {SEED_PASSWORD}.")
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin, current_user
+from routes.models_routes import User, db
+
+# flask_login user loading.
+# Every authenticated request needs current_user, but almost none of them need
+# the long profile columns (about, bio, ...). The loader therefore returns a
+# small SessionUser projection and keeps it in a bounded TTL cache; pages that
+# show or edit the profile call load_full_user() for the real User row.
+
+SESSION_USER_COLUMNS = (User.id, User.fullname, User.email, User.profile_image, User.user_name, User.joined,
+                        User.avatar_variants)
+
+
+class SessionUser(UserMixin):
+    __slots__ = ('id', 'fullname', 'email', 'profile_image', 'user_name', 'joined', 'avatar_variants')
+
+    def __init__(self, id, fullname, email, profile_image, user_name, joined, avatar_variants):
+        self.id = id
+        self.fullname = fullname
+        self.email = email
+        self.profile_image = profile_image
+        self.user_name = user_name
+        self.joined = joined
+        self.avatar_variants = avatar_variants
+
+
+class TTLCache:
+    def __init__(self, max_entries=10000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+session_user_cache = TTLCache()
+
+
+def init_session_user_cache(app):
+    # The cache is per worker, so an edit made through another worker is seen
+    # here at most SESSION_USER_CACHE_TTL seconds later.
+    session_user_cache.max_entries = app.config.get('SESSION_USER_CACHE_SIZE', 10000)
+    session_user_cache.ttl = app.config.get('SESSION_USER_CACHE_TTL', 60)
+
+
+def load_session_user(user_id):
+    user = session_user_cache.get(user_id)
+    if user is None:
+        row = db.session.query(*SESSION_USER_COLUMNS).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        user = SessionUser(*row)
+        session_user_cache.set(user_id, user)
+    return user
+
+
+def invalidate_session_user(user_id):
+    session_user_cache.delete(user_id)
+
+
+def load_full_user():
+    """Return the complete User row for the logged-in user."""
+    return db.session.get(User, current_user.id)
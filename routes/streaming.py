@@ -0,0 +1,39 @@
+from flask import Response, current_app, stream_template
+
+# Streamed page rendering.
+# With STREAM_PAGES on, the home feed and post pages are sent while they are
+# rendered: the head and navbar go out before the feed is queried, and the
+# posts (or comments) are pulled from the database a chunk at a time as the
+# template reaches them, so only one chunk is held in memory. Jinja yields
+# many tiny strings, so they are joined into pieces of STREAM_BUFFER_SIZE
+# before being written to the socket.
+#
+# Once the first piece is sent the status is fixed: an error half way through
+# ends the page early instead of turning into a 500.
+
+
+def streaming_enabled():
+    return current_app.config['STREAM_PAGES']
+
+
+def buffered(chunks, size):
+    """Join ``chunks`` into pieces of at least ``size`` characters."""
+    pending = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(pending)
+            pending = []
+            length = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def stream_page(template, **context):
+    chunks = buffered(stream_template(template, **context), current_app.config['STREAM_BUFFER_SIZE'])
+    response = Response(chunks, mimetype='text/html')
+    # Ask nginx-style proxies to pass the pieces on as they arrive
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,159 @@
+import re
+import click
+from sqlalchemy import event, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from routes.models_routes import Post, Tag, PostTag, Category, db
+
+# Categories and tags.
+# A post has at most one category (post.category_id) and up to MAX_TAGS tags
+# through post_tag, which carries a copy of the post's date so "posts tagged X,
+# newest first" is one range of ix_post_tag_tag_id_date_post_id; a category's
+# feed reads ix_post_category_id_date the same way. Tag.post_count and
+# Category.post_count are kept in step by set_post_tags and the Post mapper
+# events below, so the tag cloud reads the top of ix_tag_post_count_name
+# instead of grouping post_tag. Bulk inserts and database-level cascades skip
+# them; `flask tags recount` rebuilds the counts.
+
+CATEGORIES = {
+    'technology': 'Technology',
+    'programming': 'Programming',
+    'design': 'Design',
+    'business': 'Business',
+    'lifestyle': 'Lifestyle',
+    'health': 'Health & Wellness',
+    'travel': 'Travel',
+    'education': 'Education',
+}
+MAX_TAGS = 10
+MIN_TAG_LENGTH = 2
+MAX_TAG_LENGTH = 30
+
+
+def normalize_tags(values):
+    """Tag names from form values (each may hold several, comma separated), lower-cased, de-duplicated."""
+    names = []
+    for value in values:
+        for name in re.split(r'[,\s]+', value or ''):
+            name = name.lstrip('#').lower()
+            if MIN_TAG_LENGTH <= len(name) <= MAX_TAG_LENGTH and name not in names:
+                names.append(name)
+    return names[:MAX_TAGS]
+
+
+def _insert_missing(model, rows):
+    # Two posts may introduce the same tag at once; insert-or-ignore keeps both transactions valid
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        db.session.execute(postgresql.insert(model).on_conflict_do_nothing(), rows)
+    elif dialect == 'sqlite':
+        db.session.execute(sqlite.insert(model).on_conflict_do_nothing(), rows)
+    else:
+        for row in rows:
+            unique = {key: value for key, value in row.items() if key in ('name', 'slug')}
+            if model.query.filter_by(**unique).first() is None:
+                db.session.add(model(**row))
+        db.session.flush()
+
+
+def category_id_for(slug):
+    """The id of a known category, creating its row on first use; None for anything else."""
+    if slug not in CATEGORIES:
+        return None
+    _insert_missing(Category, [{'slug': slug, 'name': CATEGORIES[slug], 'post_count': 0}])
+    return db.session.scalar(select(Category.id).where(Category.slug == slug))
+
+
+def tag_ids_for(names):
+    """{name: id} for the given tag names, creating the tags that do not exist yet."""
+    if not names:
+        return {}
+    _insert_missing(Tag, [{'name': name, 'post_count': 0} for name in names])
+    return dict(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names))).all())
+
+
+def _adjust_tag_counts(connection, tag_ids, delta):
+    if tag_ids:
+        connection.execute(update(Tag).where(Tag.id.in_(tag_ids)).values(post_count=Tag.post_count + delta))
+
+
+def _adjust_category_count(connection, category_id, delta):
+    if category_id:
+        connection.execute(update(Category).where(Category.id == category_id)
+                           .values(post_count=Category.post_count + delta))
+
+
+def set_post_tags(post, names):
+    """Replace the tags of a flushed post with ``names``; committed with the caller's session."""
+    tag_ids = set(tag_ids_for(names).values())
+    current = set(db.session.scalars(select(PostTag.tag_id).where(PostTag.post_id == post.id)))
+    added, removed = tag_ids - current, current - tag_ids
+    if added:
+        db.session.execute(insert(PostTag), [{'post_id': post.id, 'tag_id': tag_id, 'date': post.date}
+                                             for tag_id in sorted(added)])
+        _adjust_tag_counts(db.session, added, 1)
+    if removed:
+        db.session.execute(delete(PostTag).where(PostTag.post_id == post.id, PostTag.tag_id.in_(removed)))
+        _adjust_tag_counts(db.session, removed, -1)
+    db.session.expire(post, ['tags'])
+
+
+@event.listens_for(Post, 'after_insert')
+def _count_on_insert(mapper, connection, post):
+    _adjust_category_count(connection, post.category_id, 1)
+
+
+@event.listens_for(Post, 'after_update')
+def _recount_on_update(mapper, connection, post):
+    state = db.inspect(post)
+    history = state.attrs.category_id.history
+    if history.has_changes():
+        for old in history.deleted:
+            _adjust_category_count(connection, old, -1)
+        _adjust_category_count(connection, post.category_id, 1)
+    if state.attrs.date.history.has_changes():
+        connection.execute(update(PostTag).where(PostTag.post_id == post.id).values(date=post.date))
+
+
+@event.listens_for(Post, 'before_delete')
+def _release_tags_on_delete(mapper, connection, post):
+    # Before the post row goes, while its post_tag rows are still there to count
+    tag_ids = connection.execute(select(PostTag.tag_id).where(PostTag.post_id == post.id)).scalars().all()
+    _adjust_tag_counts(connection, tag_ids, -1)
+    connection.execute(delete(PostTag).where(PostTag.post_id == post.id))
+
+
+@event.listens_for(Post, 'after_delete')
+def _count_on_delete(mapper, connection, post):
+    _adjust_category_count(connection, post.category_id, -1)
+
+
+def recount_taxonomy():
+    """Drop tag links of deleted posts and rebuild every post_count."""
+    db.session.execute(delete(PostTag).where(~select(Post.id).where(Post.id == PostTag.post_id).exists()))
+    db.session.execute(update(Tag).values(
+        post_count=select(func.count()).where(PostTag.tag_id == Tag.id).scalar_subquery()))
+    db.session.execute(update(Category).values(
+        post_count=select(func.count(Post.id)).where(Post.category_id == Category.id).scalar_subquery()))
+
+
+def tag_cloud(limit):
+    """The ``limit`` most used tags as (name, post_count), alphabetical."""
+    # Read in index order (ties by name descending) and sort for display afterwards
+    rows = (db.session.query(Tag.name, Tag.post_count)
+            .filter(Tag.post_count > 0)
+            .order_by(Tag.post_count.desc(), Tag.name.desc())
+            .limit(limit).all())
+    return sorted(rows, key=lambda row: row.name)
+
+
+def taxonomy_commands(app):
+    @app.cli.group('tags')
+    def tags():
+        """Category and tag maintenance."""
+
+    @tags.command('recount')
+    def recount():
+        """Rebuild the per-tag and per-category post counts."""
+        recount_taxonomy()
+        db.session.commit()
+        click.echo("Tag and category counts rebuilt.")
@@ -0,0 +1,143 @@
+import logging
+import math
+import time
+from datetime import datetime
+import click
+from flask import current_app
+from sqlalchemy import event, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from routes.models_routes import Post, PostScore, Comment, db
+
+# Trending ranking.
+# post_score holds a hot score per post, so the trending feed walks
+# ix_post_score_score_post_id instead of aggregating comments per request.
+# The score is log10 of the post's points (comments weighted by
+# TRENDING_COMMENT_WEIGHT, plus the likes on its comments) plus its age term:
+# a post TRENDING_DECAY_HOURS newer needs a tenth of the points to rank level.
+# Decay is relative to the post date rather than to now, so a stored score
+# never goes stale and a new comment only has to recompute its own post's row.
+#
+# New posts get a row from the mapper event below and add_comment bumps the
+# counts. Bulk inserts (the seed command), likes and deleted comments are
+# picked up by recompute_scores: `flask trending recompute` from cron, or
+# `flask trending recompute --every SECONDS` as the single clock process in the
+# Procfile. It never runs inside the web workers, so each recompute happens once.
+
+logger = logging.getLogger(__name__)
+
+SCORE_EPOCH = datetime(2020, 1, 1)
+
+
+def hot_score(comment_count, like_count, date, comment_weight, decay_hours):
+    points = comment_count * comment_weight + like_count
+    return math.log10(max(points, 1)) + (date - SCORE_EPOCH).total_seconds() / (decay_hours * 3600)
+
+
+def _score(comment_count, like_count, date):
+    config = current_app.config
+    return hot_score(comment_count, like_count, date, config['TRENDING_COMMENT_WEIGHT'], config['TRENDING_DECAY_HOURS'])
+
+
+@event.listens_for(Post, 'after_insert')
+def _score_on_insert(mapper, connection, post):
+    date = post.date or datetime.utcnow()
+    connection.execute(insert(PostScore).values(post_id=post.id, date=date, comment_count=0, like_count=0,
+                                                score=_score(0, 0, date), updated=datetime.utcnow()))
+
+
+@event.listens_for(Post, 'after_update')
+def _rescore_on_update(mapper, connection, post):
+    if db.inspect(post).attrs.date.history.has_changes():
+        row = connection.execute(select(PostScore.comment_count, PostScore.like_count)
+                                 .where(PostScore.post_id == post.id)).first()
+        if row is not None:
+            connection.execute(update(PostScore).where(PostScore.post_id == post.id).values(
+                date=post.date, score=_score(row.comment_count, row.like_count, post.date)))
+
+
+def record_engagement(post_id, comments=0, likes=0):
+    """Add to a post's counts and rescore it; committed with the caller's session."""
+    # The increment is one statement, so concurrent comments cannot lose each other's counts
+    row = db.session.execute(
+        update(PostScore).where(PostScore.post_id == post_id)
+        .values(comment_count=PostScore.comment_count + comments, like_count=PostScore.like_count + likes,
+                updated=datetime.utcnow())
+        .returning(PostScore.comment_count, PostScore.like_count, PostScore.date)).first()
+    if row is None:
+        # A post inserted in bulk; the next recompute scores it
+        return
+    db.session.execute(update(PostScore).where(PostScore.post_id == post_id)
+                       .values(score=_score(row.comment_count, row.like_count, row.date)))
+
+
+def _upsert_scores(rows):
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        statement = (postgresql if dialect == 'postgresql' else sqlite).insert(PostScore)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['post_id'],
+            set_={column: statement.excluded[column]
+                  for column in ('date', 'comment_count', 'like_count', 'score', 'updated')}), rows)
+    else:
+        db.session.execute(delete(PostScore).where(PostScore.post_id.in_([row['post_id'] for row in rows])))
+        db.session.execute(insert(PostScore), rows)
+
+
+def recompute_scores(batch_size=1000, echo=lambda message: None):
+    """Rebuild every post's counts and score from the comment table. Returns the number of posts scored."""
+    db.session.execute(delete(PostScore).where(~select(Post.id).where(Post.id == PostScore.post_id).exists()))
+    db.session.commit()
+    scored = 0
+    last_id = 0
+    while True:
+        posts = db.session.execute(select(Post.id, Post.date).where(Post.id > last_id)
+                                   .order_by(Post.id).limit(batch_size)).all()
+        if not posts:
+            break
+        counts = {blog_id: (comments, likes) for blog_id, comments, likes in db.session.execute(
+            select(Comment.blog_id, func.count(Comment.id), func.coalesce(func.sum(Comment.likes), 0))
+            .where(Comment.blog_id.in_([post.id for post in posts]))
+            .group_by(Comment.blog_id))}
+        now = datetime.utcnow()
+        rows = []
+        for post_id, date in posts:
+            comments, likes = counts.get(post_id, (0, 0))
+            date = date or now
+            rows.append({'post_id': post_id, 'date': date, 'comment_count': comments, 'like_count': likes,
+                         'score': _score(comments, likes, date), 'updated': now})
+        # One transaction per batch, so comment writes are never held up for the whole run
+        _upsert_scores(rows)
+        db.session.commit()
+        scored += len(rows)
+        last_id = posts[-1].id
+        echo(f"Scored {scored} posts.")
+    return scored
+
+
+def init_trending(app):
+    app.config.setdefault('TRENDING_COMMENT_WEIGHT', 2)
+    app.config.setdefault('TRENDING_DECAY_HOURS', 12)
+
+
+def trending_commands(app):
+    @app.cli.group('trending')
+    def trending():
+        """Maintain the trending ranking."""
+
+    @trending.command('recompute')
+    @click.option('--batch-size', default=1000, show_default=True)
+    @click.option('--every', type=int, default=0, help='Keep running, recomputing every this many seconds.')
+    def recompute(batch_size, every):
+        """Recount comments and likes and rescore every post."""
+        while True:
+            try:
+                scored = recompute_scores(batch_size, click.echo)
+                click.echo(f"Trending scores rebuilt: {scored} posts.")
+            except Exception:
+                if not every:
+                    raise
+                db.session.rollback()
+                logger.exception("Trending recompute failed")
+            if not every:
+                break
+            time.sleep(every)
@@ -0,0 +1,41 @@
+# ====================== TEST FIXTURES ======================
+# main.py reads its configuration at import time, so the database and upload
+# folders are pointed at a temporary directory before it is imported.
+import os
+import tempfile
+import pytest
+
+TMP_DIR = tempfile.mkdtemp(prefix='blog-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}"
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+os.chdir(TMP_DIR)
+
+from main import app as flask_app  # noqa: E402
+from routes.models_routes import User, db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def user(app):
+    user = User(fullname='Test User', email='test@example.com', password='x', joined='2024-01-01')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
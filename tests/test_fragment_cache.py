@@ -0,0 +1,27 @@
+# ====================== FRAGMENT CACHE BACKENDS ======================
+# The shared backends evict least recently used entries past max_entries,
+# though hits only record their use when the next entry is written.
+import time
+from routes.fragment_cache import SqliteBackend, FileSystemBackend
+
+
+def test_sqlite_backend_evicts_least_recently_used(tmp_path):
+    backend = SqliteBackend(str(tmp_path / 'cache.sqlite'), max_entries=2)
+    backend.set('a', 'A')
+    backend.set('b', 'B')
+    time.sleep(0.01)
+    assert backend.get('a') == 'A'
+    backend.set('c', 'C')
+    assert (backend.get('a'), backend.get('b'), backend.get('c')) == ('A', None, 'C')
+    assert len(backend) == 2
+
+
+def test_filesystem_backend_prunes_in_batches(tmp_path):
+    backend = FileSystemBackend(str(tmp_path), max_entries=5)
+    backend.PRUNE_EVERY = 4
+    for i in range(7):
+        backend.set(f'k{i}', str(i))
+    assert len(backend) == 7
+    backend.set('k7', '7')
+    assert len(backend) == 5
+    assert backend.get('k7') == '7'
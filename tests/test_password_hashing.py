@@ -0,0 +1,44 @@
+# ====================== PASSWORD HASHING CAP ======================
+# The in-flight cap is shared through lock files, so slots held by another
+# process (or here, another HashingSlots on the same path) count against it.
+import multiprocessing
+import pytest
+from flask_bcrypt import Bcrypt
+from routes.password_hashing import HashingSlots, HashingBusy, PasswordHasher
+
+
+def hold_slots(path, count, ready, done):
+    slots = HashingSlots(path, count)
+    held = [slots.acquire() for _ in range(count)]
+    assert None not in held
+    ready.set()
+    done.wait(10)
+
+
+def test_slots_are_shared_between_processes(tmp_path):
+    ready, done = multiprocessing.Event(), multiprocessing.Event()
+    holder = multiprocessing.Process(target=hold_slots, args=(str(tmp_path), 2, ready, done))
+    holder.start()
+    try:
+        assert ready.wait(10)
+        assert HashingSlots(str(tmp_path), 2).acquire() is None
+    finally:
+        done.set()
+        holder.join()
+    # Released when the holder exits
+    slots = HashingSlots(str(tmp_path), 2)
+    token = slots.acquire()
+    assert token is not None
+    slots.release(token)
+
+
+def test_hashing_is_refused_when_every_slot_is_taken(app, tmp_path):
+    app.config.update(PASSWORD_HASH_SLOTS_PATH=str(tmp_path), PASSWORD_HASH_MAX_PENDING=1, BCRYPT_LOG_ROUNDS=4)
+    hasher = PasswordHasher()
+    hasher.init_app(app, Bcrypt(app))
+    other = HashingSlots(str(tmp_path), 1)
+    token = other.acquire()
+    with pytest.raises(HashingBusy):
+        hasher.hash_password('secret')
+    other.release(token)
+    assert hasher.check_password(hasher.hash_password('secret'), 'secret')
@@ -0,0 +1,22 @@
+# ====================== POST PAGE CACHING ======================
+# The post page does not depend on the viewer, so its validators are shared:
+# a copy fetched anonymously revalidates for a logged-in reader and vice versa.
+from routes.models_routes import Post, db
+
+
+def test_post_page_validators_do_not_depend_on_the_viewer(app, client, user):
+    post = Post(user_id=user.id, title='Shared', content='<p>Same for everyone</p>')
+    db.session.add(post)
+    db.session.commit()
+    url = f'/post_detail/{post.id}'
+
+    anonymous = app.test_client().get(url)
+    logged_in = client.get(url)
+    assert anonymous.status_code == logged_in.status_code == 200
+    assert anonymous.get_data() == logged_in.get_data()
+    assert anonymous.headers['ETag'] == logged_in.headers['ETag']
+    assert 'public' in anonymous.headers['Cache-Control']
+    assert 'Cookie' not in anonymous.headers.get('Vary', '')
+
+    revalidated = client.get(url, headers={'If-None-Match': anonymous.headers['ETag']})
+    assert revalidated.status_code == 304
@@ -0,0 +1,26 @@
+# ====================== PROFILE LINKS ======================
+# Posting the profile form makes the user's links match the submitted rows,
+# including when every row was removed.
+from routes.models_routes import Link, db
+
+
+def links_of(user):
+    return {(link.website, link.link) for link in Link.query.filter_by(user_id=user.id)}
+
+
+def test_links_are_replaced_by_the_posted_rows(client, user):
+    db.session.add_all([Link(user_id=user.id, website='github', link='https://github.com/a'),
+                        Link(user_id=user.id, website='twitter', link='https://twitter.com/a')])
+    db.session.commit()
+
+    client.post('/editing_profile', data={'links_posted': '1', 'website': ['github', 'website'],
+                                          'link': ['https://github.com/a', 'https://a.example']})
+    assert links_of(user) == {('github', 'https://github.com/a'), ('website', 'https://a.example')}
+
+
+def test_removing_every_row_clears_the_links(client, user):
+    db.session.add(Link(user_id=user.id, website='github', link='https://github.com/a'))
+    db.session.commit()
+
+    client.post('/editing_profile', data={'links_posted': '1'})
+    assert links_of(user) == set()
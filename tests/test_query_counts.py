@@ -0,0 +1,61 @@
+# ====================== QUERY COUNTS ======================
+# The feed and post pages must run a fixed number of statements however many
+# posts and comments there are: seed N, count, seed up to 10N, count again.
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from routes.models_routes import Post, Comment, db
+
+N = 5
+
+
+def seed(user, posts, comments):
+    """Add posts with one comment each, plus `comments` comments on the first post."""
+    base = datetime(2024, 1, 1)
+    new_posts = [Post(user_id=user.id, title=f'Post {i}', content=f'<p>Body {i}</p>', date=base + timedelta(minutes=i))
+                 for i in range(posts)]
+    db.session.add_all(new_posts)
+    db.session.flush()
+    first = db.session.query(Post.id).order_by(Post.id).limit(1).scalar()
+    db.session.add_all(Comment(user_id=user.id, blog_id=post.id, content='Nice', date=post.date)
+                       for post in new_posts)
+    db.session.add_all(Comment(user_id=user.id, blog_id=first, content=f'Comment {i}', date=base)
+                       for i in range(comments))
+    db.session.commit()
+    return first
+
+
+def count_queries(client, path):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+        response.get_data()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, path
+    return len(statements)
+
+
+@pytest.mark.parametrize('path', [
+    '/',
+    '/api/feed',
+    '/post_detail/{post_id}',
+    '/api/posts/{post_id}/comments',
+])
+def test_query_count_does_not_grow_with_data(client, user, path):
+    post_id = seed(user, N, N)
+    url = path.format(post_id=post_id)
+    # Warm the per-process caches (session user, rendered cards) so both runs start alike
+    client.get(url).get_data()
+    small = count_queries(client, url)
+
+    seed(user, 9 * N, 9 * N)
+    client.get(url).get_data()
+    large = count_queries(client, url)
+
+    assert small == large